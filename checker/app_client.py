@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) seconds for requests that do not pass their own timeout.
+DEFAULT_TIMEOUT = (5, 15)
+POOL_SIZE = 4
+CHUNK_SIZE = 8 * 1024
+DEPLOY_REF_HEADER = "X-Deploy-Ref"
+DEPLOY_REF_ENDPOINT = "/version"
+# Undecided fast path probes (connection errors, 5xx) before the app is treated as having none.
+MAX_FAST_PATH_PROBES = 3
+
+_sessions = {}
+_timings = []
+_poll_states = {}
+# App URL -> "header", "endpoint" or None (the app has no fast path), decided once per run.
+_fast_paths = {}
+_fast_path_probes = {}
+
+
+@dataclass
+class RequestTiming:
+    method: str
+    url: str
+    status: int
+    elapsed: float
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout if timeout is not None else DEFAULT_TIMEOUT, **kwargs)
+
+
+def _record_timing(response: requests.Response, *args, **kwargs):
+    _timings.append(RequestTiming(response.request.method, response.url, response.status_code,
+                                  response.elapsed.total_seconds()))
+
+
+def _base_url(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def session(url: str) -> requests.Session:
+    """
+    Returns the keep-alive session for the scheme and host of `url`, shared by every
+    app module, so polls reuse one connection (and DNS lookup) instead of opening a
+    new one each time. Requests without a timeout get DEFAULT_TIMEOUT.
+    """
+    base_url = _base_url(url)
+    if base_url not in _sessions:
+        s = requests.Session()
+        adapter = _TimeoutAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        s.hooks["response"].append(_record_timing)
+        _sessions[base_url] = s
+    return _sessions[base_url]
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return session(url).get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return session(url).post(url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    return session(url).head(url, **kwargs)
+
+
+@dataclass
+class _PollState:
+    """What the last poll of a URL saw: its validators, the bytes read and the value extracted from them."""
+    etag: str | None
+    last_modified: str | None
+    prefix_length: int
+    prefix_hash: str
+    # The extractor read the whole body, so a longer body is a different one.
+    complete: bool
+    value: object
+
+
+class _ReplayResponse:
+    """
+    Streamed response whose first chunks were already read; they are handed out again
+    first, and the rest of the body after them unless the stream was `exhausted`.
+    Everything the extractor reads is hashed, so the next poll can compare.
+    """
+
+    def __init__(self, response: requests.Response, chunks: list[bytes], exhausted: bool = False):
+        self.response = response
+        self.url = response.url
+        self.encoding = response.encoding
+        self.headers = response.headers
+        self.status_code = response.status_code
+        self.raise_for_status = response.raise_for_status
+        self.close = response.close
+        self.bytes_read = 0
+        self.digest = hashlib.sha256()
+        self.complete = False
+        self._chunks = chunks
+        self._exhausted = exhausted
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        def chunks():
+            yield from self._chunks
+            if not self._exhausted:
+                yield from self.response.iter_content(chunk_size=chunk_size)
+
+        for chunk in chunks():
+            self.bytes_read += len(chunk)
+            self.digest.update(chunk)
+            yield chunk
+        self.complete = True
+
+
+def _matches_previous(response: requests.Response, state: _PollState) -> tuple[bool, list[bytes], bool]:
+    """
+    Reads just enough of the body to tell whether the part the extractor read last time
+    is unchanged. Returns the verdict, the chunks read (for replaying) and whether that
+    was the whole body: a consumed stream cannot be iterated again.
+    """
+    chunks, size = [], 0
+    # For a complete body, one more byte shows whether the body got longer.
+    needed = state.prefix_length + (1 if state.complete else 0)
+    exhausted = True
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= needed:
+            exhausted = False
+            break
+    if size < state.prefix_length or (state.complete and size != state.prefix_length):
+        return False, chunks, exhausted
+    unchanged = hashlib.sha256(b"".join(chunks)[:state.prefix_length]).hexdigest() == state.prefix_hash
+    return unchanged, chunks, exhausted
+
+
+def fetch_extracted(url: str, extract: Callable, s: requests.Session | None = None, **kwargs):
+    """
+    GETs `url` with stream=True and returns `extract(response)`, skipping the work when
+    the page did not change since the last call for this URL:
+
+    * the request carries If-None-Match/If-Modified-Since when the server sent validators,
+      and a 304 answer returns the previous value;
+    * otherwise the bytes the extractor read last time are read and hashed first, and if
+      they are identical, the previous value is returned without parsing (or logging).
+
+    The extractor may stop reading early; only what it read is compared next time.
+    """
+    state = _poll_states.get(url)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if state and state.etag:
+        headers["If-None-Match"] = state.etag
+    if state and state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+
+    response = (s or session(url)).get(url, headers=headers, stream=True, **kwargs)
+    if response.status_code == 304 and state:
+        response.close()
+        print(f"--- {url} not modified, reusing the previous result ---")
+        return state.value
+    if response.status_code != 200:
+        _poll_states.pop(url, None)
+        return extract(response)
+
+    chunks, exhausted = [], False
+    if state:
+        unchanged, chunks, exhausted = _matches_previous(response, state)
+        if unchanged:
+            response.close()
+            print(f"--- {url} unchanged, reusing the previous result ---")
+            return state.value
+
+    replay = _ReplayResponse(response, chunks, exhausted)
+    value = extract(replay)
+    _poll_states[url] = _PollState(response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                                   replay.bytes_read, replay.digest.hexdigest(), replay.complete, value)
+    return value
+
+
+def _check_probe(response: requests.Response) -> bool:
+    """
+    Whether a probe answer can be read. Any 4xx (not found, not allowed, needs auth) and
+    501 (method not implemented, e.g. HEAD on a simple server) mean the app does not
+    serve it; other 5xx errors (a 502/503 while the app is starting) raise, leaving the
+    probe undecided.
+    """
+    if 400 <= response.status_code < 500 or response.status_code == 501:
+        return False
+    response.raise_for_status()
+    return True
+
+
+def _ref_from_header(app_url: str, s: requests.Session, header: str, endpoint: str) -> str | None:
+    response = s.head(app_url, allow_redirects=True)
+    return response.headers.get(header) if _check_probe(response) else None
+
+
+def _ref_from_endpoint(app_url: str, s: requests.Session, header: str, endpoint: str) -> str | None:
+    response = s.get(urljoin(app_url, endpoint))
+    if not _check_probe(response):
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    return data.get("deploy_ref") if isinstance(data, dict) else None
+
+
+_FAST_PATH_READERS = {"header": _ref_from_header, "endpoint": _ref_from_endpoint}
+
+
+def fast_deploy_ref(app_url: str, s: requests.Session | None = None, header: str = DEPLOY_REF_HEADER,
+                    endpoint: str = DEPLOY_REF_ENDPOINT) -> str | None:
+    """
+    Reads the deploy ref without downloading the page, if the app offers a way:
+    a `header` on the answer to HEAD app_url, or `{"deploy_ref": ...}` served at `endpoint`.
+
+    Which of them the app supports is probed on the first call and remembered for the
+    run, so every later poll costs one small round trip. A 4xx or an answer without the
+    ref means "no fast path"; after connection errors and 5xx answers the next call
+    probes again, up to MAX_FAST_PATH_PROBES times in all. Returns None when the app has
+    no fast path (or it failed this time); the caller then scrapes the page.
+    """
+    s = s or session(app_url)
+    if app_url in _fast_paths:
+        kind = _fast_paths[app_url]
+        if kind is None:
+            return None
+        try:
+            return _FAST_PATH_READERS[kind](app_url, s, header, endpoint)
+        except requests.exceptions.RequestException:
+            return None
+
+    for kind, reader in _FAST_PATH_READERS.items():
+        try:
+            deploy_ref = reader(app_url, s, header, endpoint)
+        except requests.exceptions.RequestException:
+            # Undecided, probe again on the next call unless that happened too often.
+            _fast_path_probes[app_url] = _fast_path_probes.get(app_url, 0) + 1
+            if _fast_path_probes[app_url] >= MAX_FAST_PATH_PROBES:
+                print(f"--- {app_url} fast path probes keep failing, scraping the page from now on ---")
+                _fast_paths[app_url] = None
+            return None
+        if deploy_ref:
+            print(f"--- {app_url} serves its deploy ref via {kind}, using it from now on ---")
+            _fast_paths[app_url] = kind
+            return deploy_ref
+    _fast_paths[app_url] = None
+    return None
+
+
+def request_timings() -> list[RequestTiming]:
+    """Time to response headers of every app request made so far, in order."""
+    return list(_timings)
+
+
+def timing_summary() -> str:
+    if not _timings:
+        return "No app requests were made."
+    elapsed = sorted(t.elapsed for t in _timings)
+    return (f"{len(elapsed)} app requests: median {elapsed[len(elapsed) // 2] * 1000:.0f} ms, "
+            f"max {elapsed[-1] * 1000:.0f} ms, total {sum(elapsed):.1f} s")
+
+
+def close_sessions():
+    for s in _sessions.values():
+        s.close()
+    _sessions.clear()
+    _timings.clear()
+    _poll_states.clear()
+    _fast_paths.clear()
+    _fast_path_probes.clear()
@@ -1 +1,40 @@
 # checker/apps/__init__.py
+"""
+One API per student application, returned by load_app: a JSON descriptor compiled into
+a DescribedApp for apps that follow the common pattern, or a module of the same name for
+apps that need custom code. The checks call these functions of it:
+
+* is_alive(base_url) -> bool
+* extract_deploy_ref(app_url) -> str: the deployed ref; raises ValueError (or returns None)
+  when it cannot be read. Apps may serve it in an X-Deploy-Ref response header or as
+  {"deploy_ref": ...} at /version; checker.app_client.fast_deploy_ref tries those first
+  and the module's own scraping stays the fallback.
+* get_data(base_url), generate_random_data(base_url): for the data consistency checks.
+"""
+
+import functools
+import importlib
+import json
+import os
+
+_DIRECTORY = os.path.dirname(__file__)
+
+
+@functools.lru_cache(maxsize=None)
+def load_app(app: str):
+    """
+    Returns the API of an app by its name (e.g. "website-example").
+
+    A descriptor `<name>.json` in this package is compiled into a DescribedApp once;
+    otherwise the Python module `checker.apps.<name>` is imported, for apps that need
+    custom code. Either way only what the app uses gets imported.
+
+    :raises ImportError: If the app has neither a descriptor nor a module.
+    """
+    name = app.replace('-', '_')
+    descriptor_path = os.path.join(_DIRECTORY, f"{name}.json")
+    if os.path.exists(descriptor_path):
+        from ._descriptor import DescribedApp
+        with open(descriptor_path) as f:
+            return DescribedApp(name, json.load(f))
+    return importlib.import_module(f"{__name__}.{name}")
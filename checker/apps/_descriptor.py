@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+import uuid
+
+import requests
+
+from checker import app_client
+
+DEPLOY_REF_SOURCES = ("meta", "openapi")
+
+
+def _fill(template, values: dict):
+    """Formats every string in a JSON-like template with `values` (e.g. "{uuid}")."""
+    if isinstance(template, str):
+        return template.format(**values)
+    if isinstance(template, list):
+        return [_fill(item, values) for item in template]
+    if isinstance(template, dict):
+        return {key: _fill(value, values) for key, value in template.items()}
+    return template
+
+
+class DescribedApp:
+    """
+    App API built from a JSON descriptor instead of a Python module. It has the same
+    functions as an app module (is_alive, extract_deploy_ref, get_data, generate_random_data).
+
+    Descriptor keys, paths are relative to the app URL:
+
+    * "alive": {"path": "/"} - GET must answer 2xx.
+    * "data": {"path": "/api/posts", "default": {}} - GET returns the data as JSON,
+      `default` is returned when that fails.
+    * "create": {"path": "/api/post", "json": {...}, "returns": "payload" | "response"} -
+      POSTs the template with "{uuid}" filled in; returns the payload or the JSON answer.
+    * "auth" (optional): {"type": "basic", "username": ..., "password": ...} or
+      {"type": "form", "path": "/login", "form": {...}} - form login keeps cookies in the session.
+    * "deploy_ref": {"source": "meta", "name": "deployref"} or
+      {"source": "openapi", "path": "/swagger/v1/swagger.json", "pattern": "Deploy Ref: ([^)]+)"}.
+    """
+
+    def __init__(self, name: str, descriptor: dict):
+        self.name = name
+        self.alive = descriptor.get("alive", {"path": "/"})
+        self.data = descriptor["data"]
+        self.create = descriptor["create"]
+        self.auth = descriptor.get("auth")
+        self.deploy_ref = descriptor["deploy_ref"]
+        if self.deploy_ref.get("source") not in DEPLOY_REF_SOURCES:
+            raise ValueError(f"App '{name}': deploy_ref source must be one of {', '.join(DEPLOY_REF_SOURCES)}")
+        self._pattern = re.compile(self.deploy_ref["pattern"]) if "pattern" in self.deploy_ref else None
+        self._logged_in = set()
+
+    @staticmethod
+    def _url(base_url: str, path: str) -> str:
+        return base_url.rstrip("/") + path if path != "/" else base_url
+
+    def _session(self, base_url: str) -> requests.Session:
+        session = app_client.session(base_url)
+        if self.auth and base_url not in self._logged_in:
+            if self.auth["type"] == "basic":
+                session.auth = (self.auth["username"], self.auth["password"])
+            else:
+                print("--- Attempting to log in ---")
+                response = session.post(self._url(base_url, self.auth["path"]), data=self.auth["form"], timeout=10)
+                response.raise_for_status()
+            self._logged_in.add(base_url)
+        return session
+
+    def is_alive(self, base_url: str) -> bool:
+        url = self._url(base_url, self.alive["path"])
+        print(f"--- Running Test: GET request to {url} ---")
+        try:
+            response = self._session(base_url).get(url, timeout=10)
+            return str(response.status_code).startswith("2")
+        except requests.exceptions.RequestException:
+            return False
+
+    def get_data(self, base_url: str):
+        url = self._url(base_url, self.data["path"])
+        print(f"--- Getting data from {url} ---")
+        try:
+            response = self._session(base_url).get(url)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to get data: {e}")
+            return self.data.get("default", {})
+
+    def generate_random_data(self, base_url: str):
+        url = self._url(base_url, self.create["path"])
+        payload = _fill(self.create.get("json"), {"uuid": uuid.uuid4()})
+        print(f"--- Adding data to {url} ---")
+        try:
+            response = self._session(base_url).post(url, json=payload)
+            response.raise_for_status()
+            result = response.json() if self.create.get("returns") == "response" else payload
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to add data: {e}")
+            return None
+        print(f"Successfully added data: {result}")
+        return result
+
+    def extract_deploy_ref(self, app_url: str) -> str:
+        session = self._session(app_url)
+        deploy_ref = app_client.fast_deploy_ref(app_url, session)
+        if deploy_ref is not None:
+            return deploy_ref
+
+        if self.deploy_ref["source"] == "meta":
+            from checker.extractors import find_meta_content
+            name = self.deploy_ref.get("name", "deployref")
+            deploy_ref = app_client.fetch_extracted(app_url, lambda response: find_meta_content(response, name), session)
+            where = f"Meta tag with '{name}' name"
+        else:
+            from checker.extractors import find_openapi_description
+
+            def read_description(response):
+                response.raise_for_status()
+                return find_openapi_description(response)
+
+            url = self._url(app_url, self.deploy_ref["path"])
+            try:
+                deploy_ref = app_client.fetch_extracted(url, read_description, session)
+            except requests.exceptions.RequestException as e:
+                raise ValueError(f"Failed to fetch {url}: {e}") from e
+            where = f"Deploy ref in the description at {url}"
+
+        if deploy_ref is not None and self._pattern:
+            match = self._pattern.search(deploy_ref)
+            deploy_ref = match.group(1).strip() if match else None
+        if deploy_ref is None:
+            raise ValueError(f"{where} not found")
+        return deploy_ref
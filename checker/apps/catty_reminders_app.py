@@ -1,8 +1,11 @@
+from __future__ import annotations
+
 import requests
 import uuid
 
+from checker import app_client
+from checker.extractors import find_meta_content
 from checker.utils import log_body
-from bs4 import BeautifulSoup
 
 # Global session object to maintain the session across function calls
 _session = None
@@ -21,7 +24,8 @@ def _login(base_url: str):
         return
 
     print("--- Attempting to log in ---")
-    session = requests.Session()
+    session = app_client.session(base_url)
+    session.cookies.clear()
     login_url = f"{base_url}/login"
     credentials = {
         "username": USERNAME,
@@ -110,15 +114,21 @@ def is_alive(base_url: str) -> bool:
     except ConnectionError:
         return False
 
+def _read_deploy_ref(response) -> str | None:
+    print(f"--- Received response from: {response.url} ---")
+    seen = bytearray()
+    deploy_ref = find_meta_content(response, "deployref", seen)
+    # Only the part of the page read up to the tag is logged.
+    log_body(seen.decode(response.encoding or "utf-8", errors="replace"))
+    return deploy_ref
+
 def extract_deploy_ref(app_url: str) -> str:
+    deploy_ref = app_client.fast_deploy_ref(app_url, _session)
+    if deploy_ref is not None:
+        return deploy_ref
     print(f"--- Sending GET request to {app_url} ---")
-    response = requests.get(app_url)
-    print(f"--- Received response from: {response.url} ---")
-    body = response.text
-    log_body(body)
-    soup = BeautifulSoup(body, "html.parser")
-    meta_tag = soup.find("meta", attrs={"name": "deployref"})
-    if meta_tag:
-        return meta_tag.get("content")
+    deploy_ref = app_client.fetch_extracted(app_url, _read_deploy_ref, _session)
+    if deploy_ref is not None:
+        return deploy_ref
     else:
         raise ValueError("Meta tag with 'deployref' name not found on page")
\ No newline at end of file
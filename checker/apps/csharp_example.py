@@ -1,31 +1,39 @@
+from __future__ import annotations
+
 import requests
 import re
 import json
 import uuid
 
+from checker import app_client
+from checker.extractors import find_openapi_description
+
 def is_alive(base_url: str) -> bool:
     """
     Checks if the application is alive by making a GET request to the base URL.
     """
     print(f"--- Running Test: GET request to {base_url} ---")
     try:
-        response = requests.get(f"{base_url}/swagger/v1/swagger.json", timeout=10)
+        response = app_client.get(f"{base_url}/swagger/v1/swagger.json", timeout=10)
         return str(response.status_code).startswith("2")
     except requests.exceptions.RequestException:
         return False
 
+def _read_description(response) -> str | None:
+    response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
+    return find_openapi_description(response)
+
 def extract_deploy_ref(app_url: str) -> str | None:
     """
     Extracts the deploy reference from the Swagger JSON's info.description field.
     """
+    deploy_ref = app_client.fast_deploy_ref(app_url)
+    if deploy_ref is not None:
+        return deploy_ref
     swagger_url = f"{app_url}/swagger/v1/swagger.json"
     print(f"--- Attempting to extract deploy ref from Swagger at {swagger_url} ---")
     try:
-        response = requests.get(swagger_url, timeout=10)
-        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-        swagger_json = response.json()
-
-        description = swagger_json.get('info', {}).get('description')
+        description = app_client.fetch_extracted(swagger_url, _read_description, timeout=10)
         if description:
             match = re.search(r"Deploy Ref: ([^)]+)", description)
             if match:
@@ -52,7 +60,7 @@ def get_data(base_url: str) -> list[str]:
     """
     print(f"--- Getting words from {base_url}/api/Words ---")
     try:
-        response = requests.get(f"{base_url}/api/Words")
+        response = app_client.get(f"{base_url}/api/Words")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -67,7 +75,7 @@ def generate_random_data(base_url: str) -> str | None:
     post_url = f"{base_url}/api/Words?value={random_word}"
     print(f"--- Adding word to {post_url} ---")
     try:
-        response = requests.post(post_url)
+        response = app_client.post(post_url)
         response.raise_for_status()
         print(f"Successfully added data: {random_word}")
         return random_word
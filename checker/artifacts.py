@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+import requests
+
+from .reports import ReportSummary, parse_report
+
+# Artifacts up to this size stay in memory, bigger ones are spooled to disk.
+SPOOL_MEMORY_LIMIT = 8 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PROGRESS_EVERY = 16 * 1024 * 1024
+
+
+class _MappedFile:
+    """File-like view over an mmap; mmap objects only gained seekable() in Python 3.13."""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+        self.read = mapped.read
+        self.seek = mapped.seek
+        self.tell = mapped.tell
+
+    def seekable(self) -> bool:
+        return True
+
+
+def download_artifact(url: str, token: str, max_bytes: int) -> tuple[tempfile.SpooledTemporaryFile, int]:
+    """
+    Streams an artifact archive into a spooled temporary file.
+
+    :param url: The artifact's archive_download_url.
+    :param token: GitHub token used to authorize the download.
+    :param max_bytes: Downloads bigger than this are aborted with a ValueError.
+    :return: The temporary file, rewound to the start, and its size in bytes.
+    """
+    headers = {'Authorization': f'token {token}'}
+    response = requests.get(url, headers=headers, allow_redirects=True, stream=True)
+    try:
+        response.raise_for_status()
+
+        declared_size = int(response.headers.get("Content-Length") or 0)
+        if declared_size > max_bytes:
+            raise ValueError(f"Artifact is {declared_size} bytes, the limit is {max_bytes} bytes")
+
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_LIMIT)
+        size = 0
+        next_progress = PROGRESS_EVERY
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                spool.close()
+                raise ValueError(f"Artifact exceeds the limit of {max_bytes} bytes")
+            spool.write(chunk)
+            if size >= next_progress:
+                print(f"Downloaded {size // (1024 * 1024)} MiB of the artifact...")
+                next_progress += PROGRESS_EVERY
+    finally:
+        response.close()
+
+    spool.seek(0)
+    return spool, size
+
+
+def open_artifact_zip(stack: contextlib.ExitStack, spool: tempfile.SpooledTemporaryFile, size: int) -> zipfile.ZipFile:
+    """
+    Opens the downloaded archive. Archives that were spooled to disk are memory-mapped,
+    so members are read lazily straight from the page cache.
+    """
+    source = spool
+    if size > SPOOL_MEMORY_LIMIT:
+        source = _MappedFile(stack.enter_context(mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)))
+    return stack.enter_context(zipfile.ZipFile(source))
+
+
+class ArtifactCache:
+    """
+    Content-addressed store of downloaded artifacts, one directory per artifact ID and digest.
+
+    Each entry keeps the raw archive and the parsed summary next to it, so checking the
+    same artifact again (re-run for the same commit) needs neither the download nor the
+    parse. Entries are evicted least-recently-used first once their total size exceeds
+    `max_bytes`. Entries are published with an atomic rename, so runs may share a directory.
+    """
+
+    ARCHIVE = "artifact.zip"
+    SUMMARY = "summary.json"
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def _key(artifact) -> str | None:
+        # Only artifacts with a content digest can be addressed safely.
+        digest = getattr(artifact, "digest", None)
+        if not isinstance(digest, str) or not isinstance(artifact.id, int):
+            return None
+        return f"{artifact.id}-{digest.replace(':', '-')}"
+
+    def load_summary(self, artifact) -> ReportSummary | None:
+        key = self._key(artifact)
+        if key is None:
+            return None
+        entry = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry, self.SUMMARY)) as f:
+                summary = ReportSummary(**json.load(f))
+            os.utime(entry)
+        except (OSError, ValueError, TypeError):
+            return None
+        return summary
+
+    def store(self, artifact, spool, summary: ReportSummary):
+        key = self._key(artifact)
+        if key is None:
+            return
+        algorithm, _, expected = artifact.digest.partition(":")
+        tmp_entry = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            spool.seek(0)
+            digest = hashlib.new(algorithm)
+            with open(os.path.join(tmp_entry, self.ARCHIVE), "wb") as f:
+                for chunk in iter(lambda: spool.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+            if digest.hexdigest() != expected:
+                print(f"Artifact '{artifact.name}' does not match its digest, not caching it.")
+                return
+            with open(os.path.join(tmp_entry, self.SUMMARY), "w") as f:
+                json.dump(asdict(summary), f)
+            os.rename(tmp_entry, os.path.join(self.directory, key))
+        except (OSError, ValueError):
+            # ValueError: unknown digest algorithm. OSError: another run published the entry first.
+            pass
+        finally:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            if name.startswith(".tmp-") or not os.path.isdir(entry):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((os.path.getmtime(entry), size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def _summarize_zip(z: zipfile.ZipFile) -> ReportSummary:
+    summary = ReportSummary()
+    for filename in z.namelist():
+        with z.open(filename) as report_file:
+            report = parse_report(filename, report_file)
+        if report:
+            summary.add(report)
+    return summary
+
+
+def summarize_artifact(artifact, token: str, max_bytes: int, cache: ArtifactCache | None = None) -> ReportSummary:
+    """Downloads one artifact and sums up every test report (JUnit, TRX, pytest-json) in it."""
+    if cache is not None:
+        summary = cache.load_summary(artifact)
+        if summary is not None:
+            print(f"Using cached results of artifact '{artifact.name}'.")
+            return summary
+
+    spool, size = download_artifact(artifact.archive_download_url, token, max_bytes)
+    print(f"Downloaded artifact '{artifact.name}' ({size} bytes).")
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(spool)
+        summary = _summarize_zip(open_artifact_zip(stack, spool, size))
+        if cache is not None:
+            cache.store(artifact, spool, summary)
+    return summary
+
+
+def summarize_artifacts(artifacts: list, token: str, max_bytes: int, workers: int,
+                        cache: ArtifactCache | None = None) -> ReportSummary:
+    """
+    Downloads and parses several artifacts (e.g. one per matrix job) in a thread pool
+    and merges their results. The first failing download or parse error is re-raised.
+    """
+    summary = ReportSummary()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for artifact_summary in pool.map(lambda artifact: summarize_artifact(artifact, token, max_bytes, cache), artifacts):
+            summary.add(artifact_summary)
+    return summary
@@ -1,20 +1,58 @@
+from __future__ import annotations
+
 import time
+from datetime import datetime, timedelta, timezone
 from time import sleep
+from typing import TYPE_CHECKING
 import requests
-from github import Github
-from .utils import CICommit
+from .polling import PollStrategy, make_poll_strategy
+from .webhooks import active_receiver
+from .rate_limit import low_priority
 import os
 import shutil
-import pygit2
-import subprocess
-import zipfile
-import io
-import xml.etree.ElementTree as ET
+import tempfile
+import zlib
+from fnmatch import fnmatch
+
+# GitHub (PyGithub), git (pygit2), the registry and the artifact parsers are imported by
+# the checks that use them, so an entry point only pays for the ones it runs.
+if TYPE_CHECKING:
+    from .github_client import GithubContext, WorkflowRunRegistry
+    from .utils import CICommit
+
 
+_CACHE_ROOT = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "check-assignment")
+
+RELEASE_CLOCK_SKEW = timedelta(minutes=1)
 
 CONFIG = {
     "timeout": 120,
     "poll_interval": 15,
+    "poll_strategy": "backoff",
+    "webhook_grace": 30,
+    "http_cache_dir": os.path.join(_CACHE_ROOT, "http"),
+    "rate_limit_state": os.path.join(_CACHE_ROOT, "rate-limit.json"),
+    "artifact_max_bytes": 256 * 1024 * 1024,
+    "test_artifact_pattern": "test_result*",
+    "artifact_workers": 4,
+    "artifact_cache_dir": os.path.join(_CACHE_ROOT, "artifacts"),
+    "artifact_cache_max_bytes": 1024 * 1024 * 1024,
+    "clone_depth": 1,
+    # Off by default: a cold mirror fetches full history, which ephemeral runners would pay
+    # for on every run. Worth it on self-hosted runners, where ~/.cache persists.
+    "mirror_cache_dir": None,
+    "mirror_cache_max_bytes": 2 * 1024 * 1024 * 1024,
+    "image_max_compressed_bytes": 512 * 1024 * 1024,
+    "image_max_uncompressed_bytes": 1536 * 1024 * 1024,
+    "image_max_layers": 40,
+    # Measuring uncompressed sizes downloads every layer of the image and of the previous
+    # one, so it is opt-in; layers above the cap are reported as unmeasured.
+    "image_measure_uncompressed": False,
+    "image_measure_max_layer_bytes": 128 * 1024 * 1024,
+    "layer_size_cache": os.path.join(_CACHE_ROOT, "layer-sizes.json"),
+    "retention_keep_last": 5,
+    "retention_max_age_days": 14,
+    "retention_dry_run": False,
     "sa_login": "Name Example",
     "sa_mail": "e@mail.com"
 }
@@ -38,13 +76,18 @@ def check_app_is_alive(app_api, url: str) -> bool:
         return False
 
 
-def _run_with_timeout(condition, timeout: int, poll_interval: int) -> bool:
+def _poll_delays(poll_interval: float):
+    return make_poll_strategy(CONFIG["poll_strategy"], poll_interval).delays()
+
+
+def _run_with_timeout(condition, timeout: int, poll_interval: int, strategy: PollStrategy | None = None) -> bool:
+    delays = strategy.delays() if strategy else _poll_delays(poll_interval)
     start_time = time.time()
     while time.time() - start_time < timeout:
         print(f"Checking condition... (elapsed: {int(time.time() - start_time)}s)")
         if condition():
             return True
-        sleep(poll_interval)
+        sleep(next(delays))
     print(f"Timeout of {timeout} seconds reached.")
     return False
 
@@ -79,22 +122,61 @@ def check_event_update_site(app_api, app_url: str, commit: CICommit) -> bool:
         print(f"Test FAILED: Site was not updated after {CONFIG['timeout']} seconds.")
         return False
 
-def _get_workflow_run(repo, find_run_func):
+def _wait_before_refresh(workflow_run, delays, start_time: float):
+    """
+    Waits until it is worth re-reading the workflow run from the API.
+
+    With an active webhook receiver the wait ends as soon as a completion event arrives.
+    If no event at all shows up for the run within CONFIG["webhook_grace"] seconds,
+    the receiver is ignored and the usual polling delays are used instead. The same
+    happens once the completion event was used: if the API still reports the run as
+    running (replication lag), it is polled again after the usual delay.
+    """
+    receiver = active_receiver()
+    if receiver is not None and not receiver.completion_consumed(workflow_run.id, workflow_run.check_suite_id):
+        elapsed = time.time() - start_time
+        if receiver.has_events_for(workflow_run.id, workflow_run.check_suite_id):
+            window = CONFIG["timeout"] - elapsed
+        else:
+            window = CONFIG["webhook_grace"] - elapsed
+        if window > 0:
+            if receiver.wait_for_completion(workflow_run.id, workflow_run.check_suite_id, timeout=window):
+                print("Received completion event for the workflow run.")
+            return
+    sleep(next(delays))
+
+def _refresh_workflow_run(repo, run_id: int):
+    with low_priority():
+        workflow_run = repo.get_workflow_run(run_id)
+        # Repository handles are lazy: reading an attribute is what sends the request.
+        workflow_run.status
+    return workflow_run
+
+def _get_workflow_run(repo, find_run_func, registry: WorkflowRunRegistry | None = None, run_key: tuple | None = None):
     """
     Waits for a specific workflow run to complete and returns the run object.
     :param repo: The repository object from PyGithub.
     :param find_run_func: A function that returns the specific workflow run to wait for, or None if not found.
+    :param registry: Registry of runs already waited for in this check run.
+    :param run_key: Key of the run in the registry, e.g. ("sha", commit_sha).
     :return: The completed workflow run object, or None if not found or on error.
     """
+    if registry is not None and registry.get(run_key):
+        workflow_run = registry.get(run_key)
+        print(f"Reusing completed workflow run: {workflow_run.html_url}")
+        return workflow_run
+
     try:
         # Poll to find the run
         workflow_run = None
+        delays = _poll_delays(CONFIG["poll_interval"])
         for _ in range(5):
-            run = find_run_func()
+            with low_priority():
+                run = find_run_func()
             if run:
                 workflow_run = run
                 break
-            sleep(CONFIG["poll_interval"])
+            sleep(next(delays))
         
         if not workflow_run:
             print("Test FAILED: No workflow run found.")
@@ -104,31 +186,36 @@ def _get_workflow_run(repo, find_run_func):
 
         # Wait for the workflow to complete
         timeout = CONFIG["timeout"]
+        delays = _poll_delays(CONFIG["poll_interval"])
         start_time = time.time()
         while workflow_run.status in ["queued", "in_progress"]:
             if time.time() - start_time > timeout:
                 print("Test FAILED: Workflow run timed out.")
                 return None  # Return None on timeout
             print(f"Workflow status is '{workflow_run.status}'. Waiting...")
-            sleep(CONFIG["poll_interval"])
-            workflow_run = repo.get_workflow_run(workflow_run.id)
+            _wait_before_refresh(workflow_run, delays, start_time)
+            workflow_run = _refresh_workflow_run(repo, workflow_run.id)
 
         print(f"Workflow finished with status '{workflow_run.status}' and conclusion '{workflow_run.conclusion}'.")
+        if registry is not None:
+            registry.put(run_key, workflow_run)
         return workflow_run
             
     except Exception as e:
         print(f"Test FAILED: An error occurred while waiting for the workflow run: {e}")
         return None
 
-def _wait_for_workflow_run(repo, find_run_func) -> bool:
+def _wait_for_workflow_run(repo, find_run_func, registry: WorkflowRunRegistry | None = None, run_key: tuple | None = None) -> bool:
     """
     Waits for a specific workflow run to complete.
 
     :param repo: The repository object from PyGithub.
     :param find_run_func: A function that returns the specific workflow run to wait for, or None if not found.
+    :param registry: Registry of runs already waited for in this check run.
+    :param run_key: Key of the run in the registry, e.g. ("sha", commit_sha).
     :return: True if the workflow run is found and completes successfully, False otherwise.
     """
-    workflow_run = _get_workflow_run(repo, find_run_func)
+    workflow_run = _get_workflow_run(repo, find_run_func, registry, run_key)
     if workflow_run and workflow_run.conclusion == "success":
         print("Test PASSED: Workflow run completed successfully.")
         return True
@@ -136,52 +223,63 @@ def _wait_for_workflow_run(repo, find_run_func) -> bool:
         print(f"Test FAILED: Workflow run conclusion is '{workflow_run.conclusion if workflow_run else 'unknown'}'.")
         return False
 
-def check_workflow_run_success(repo_name: str, commit_sha: str, github_token: str) -> bool:
-    print(f"--- Running Test: Check workflow run for commit {commit_sha} in repo {repo_name} ---")
-    g = Github(github_token)
-    repo = g.get_repo(repo_name)
-    
+def _commit_run_finder(repo, commit_sha: str):
     def find_run_by_commit():
         runs = repo.get_workflow_runs(head_sha=commit_sha)
         return runs[0] if runs.totalCount > 0 else None
 
-    return _wait_for_workflow_run(repo, find_run_by_commit)
+    return find_run_by_commit
 
+def check_workflow_run_success(repo_name: str, commit_sha: str, gh: GithubContext) -> bool:
+    print(f"--- Running Test: Check workflow run for commit {commit_sha} in repo {repo_name} ---")
+    repo = gh.get_repo(repo_name)
+
+    return _wait_for_workflow_run(repo, _commit_run_finder(repo, commit_sha), gh.runs, ("sha", commit_sha))
+
+
+def check_required_workflow_files(repo_url: str, branch_name: str, files: list[str], ci_commit: CICommit | None = None) -> bool:
+    """
+    Checks that every path in `files` (glob patterns such as ".github/workflows/*.y*ml" are
+    allowed) exists on the branch. The branch tree already fetched by `ci_commit` is used
+    when it is for the same branch, another branch of its repository is fetched into it.
+    Otherwise the branch is fetched into a bare repository (through the mirror cache if
+    one is configured).
+    """
+    import pygit2
+    from .utils import CICommit, fetch_branch, find_in_tree, mirror_cache
 
-def check_required_workflow_files(repo_url: str, branch_name: str, files: list[str]) -> bool:
     print(f"--- Running Test: Check for required workflow files in {repo_url} on branch {branch_name} ---")
     
     temp_dir = None
     try:
-        # Create a temporary directory for cloning
-        temp_dir = os.path.join('/tmp', f"repo_clone_{os.urandom(8).hex()}")
-        os.makedirs(temp_dir)
-
-        # Clone the repository
-        # For SSH authentication, pygit2 will automatically use the SSH agent if configured.
-        print(f"Cloning {repo_url} into {temp_dir}")
-        callbacks = pygit2.RemoteCallbacks(
-            credentials=pygit2.KeypairFromAgent("git")
-        )
-        repo = pygit2.clone_repository(repo_url, temp_dir, checkout_branch=branch_name, callbacks=callbacks)
-
-        all_files_exist = True
+        if isinstance(ci_commit, CICommit) and ci_commit.branch == branch_name:
+            tree = ci_commit.repo[ci_commit.parent_sha].tree
+        elif isinstance(ci_commit, CICommit) and ci_commit.repo_ssh_url == repo_url:
+            # Same repository, other branch: fetch it into the run's repository.
+            ci_commit.origin.fetch([branch_name], ci_commit.config.get("clone_depth", 1))
+            tree = ci_commit.repo[ci_commit.origin.tip(branch_name)].tree
+        else:
+            temp_dir = tempfile.mkdtemp(prefix="repo_clone_")
+            # For SSH authentication, pygit2 will automatically use the SSH agent if configured.
+            print(f"Fetching {branch_name} of {repo_url} into {temp_dir}")
+            callbacks = pygit2.RemoteCallbacks(
+                credentials=pygit2.KeypairFromAgent("git")
+            )
+            repo = fetch_branch(repo_url, branch_name, temp_dir, callbacks, CONFIG["clone_depth"], mirror_cache(CONFIG))
+            tree = repo[repo.references[f"refs/remotes/origin/{branch_name}"].target].tree
+
         for file_path in files:
-            full_path = os.path.join(temp_dir, file_path)
-            if not os.path.exists(full_path):
+            found = find_in_tree(tree, file_path)
+            if not found:
                 print(f"Test FAILED: Required file '{file_path}' does not exist.")
-                all_files_exist = False
-                break
-            print(f"Found required file: '{file_path}'.")
+                return False
+            print(f"Found required file(s) for '{file_path}': {', '.join(found)}.")
 
-        if all_files_exist:
-            print("Test PASSED: All required workflow files exist.")
-            return True
-        else:
-            return False
+        print("Test PASSED: All required workflow files exist.")
+        return True
 
     except pygit2.GitError as e:
-        print(f"Test FAILED: Git error during cloning or checkout: {e}")
+        print(f"Test FAILED: Git error while fetching the branch: {e}")
         return False
     except Exception as e:
         print(f"Test FAILED: An unexpected error occurred: {e}")
@@ -192,7 +290,32 @@ def check_required_workflow_files(repo_url: str, branch_name: str, files: list[s
             shutil.rmtree(temp_dir)
 
 
-def check_release_updates_site(app_api, app_url: str, repo_name: str, github_token: str, commit_sha: str) -> bool:
+def _release_run_finder(repo, tag_name: str, released_at: datetime):
+    """
+    Returns a find_run_func for the workflow run triggered by releasing `tag_name`.
+
+    Runs are filtered on the server (release event, tag as branch, created after the
+    release), so every poll reads a single page of GithubContext's `per_page` runs.
+    The scan stops at the first run older than the release.
+    """
+    # Leave room for clock skew between the runner and GitHub.
+    not_before = released_at - RELEASE_CLOCK_SKEW
+    created_filter = f">={not_before.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
+    def find_run_by_release_tag():
+        runs = repo.get_workflow_runs(event='release', branch=tag_name, created=created_filter)
+        for run in runs.get_page(0):
+            if run.created_at < not_before:
+                break
+            # For release events, the branch is the tag name
+            if run.head_branch == tag_name:
+                return run
+        return None
+
+    return find_run_by_release_tag
+
+
+def check_release_updates_site(app_api, app_url: str, repo_name: str, gh: GithubContext, commit_sha: str) -> bool:
     print(f"--- Running Test: Check if a new release triggers a site update for repo {repo_name} ---")
     try:
         # 1. Get the deploy ref before the release
@@ -201,10 +324,10 @@ def check_release_updates_site(app_api, app_url: str, repo_name: str, github_tok
         print(f"Initial deploy ref: {ref_before}")
 
         # 2. Create a git tag and release
-        g = Github(github_token)
-        repo = g.get_repo(repo_name)
+        repo = gh.get_repo(repo_name)
 
         tag_name = time.strftime("ci-%Y%m%d-%H%M%S")
+        released_at = datetime.now(timezone.utc)
         print(f"Using commit SHA for release: {commit_sha}")
         print(f"Creating git ref 'refs/tags/{tag_name}'...")
         repo.create_git_ref(ref=f'refs/tags/{tag_name}', sha=commit_sha)
@@ -216,15 +339,7 @@ def check_release_updates_site(app_api, app_url: str, repo_name: str, github_tok
         # 3. Wait for the release-triggered workflow to complete
         print("--- Checking for CD workflow triggered by release ---")
         
-        def find_run_by_release_tag():
-            runs = repo.get_workflow_runs(event='release')
-            for run in runs:
-                # For release events, the branch is the tag name
-                if run.head_branch == tag_name:
-                    return run
-            return None
-
-        if not _wait_for_workflow_run(repo, find_run_by_release_tag):
+        if not _wait_for_workflow_run(repo, _release_run_finder(repo, tag_name, released_at), gh.runs, ("tag", tag_name)):
             print("Test FAILED: The release did not trigger a successful CD workflow.")
             return False
         
@@ -269,54 +384,105 @@ def check_deploy_ref_matches_commit(app_api, app_url: str, expected_commit_sha:
         return False
 
 
-def check_docker_image_exists(image_name: str, tag: str, github_token: str) -> bool:
-    print(f"--- Running Test: Check if Docker image ghcr.io/{image_name}:{tag} exists via Docker CLI ---")
+def check_docker_image_exists(image_name: str, tag: str, gh: GithubContext) -> bool:
+    from .registry import registry_client
+
+    print(f"--- Running Test: Check if Docker image ghcr.io/{image_name}:{tag} exists via the registry API ---")
 
     full_image_name = f"ghcr.io/{image_name}:{tag}"
-    sa_login_username = CONFIG["sa_login"]
+    registry = registry_client("ghcr.io", CONFIG["sa_login"], gh.token)
 
-    try:
-        login_command = ["docker", "login", "ghcr.io", "-u", sa_login_username, "--password-stdin"]
-        login_result = subprocess.run(login_command, input=github_token, text=True, capture_output=True)
+    print(f"Waiting for up to {CONFIG['timeout']} seconds for image {full_image_name} to be published...")
 
-        if login_result.returncode != 0:
-            print(f"Test FAILED: Docker login to ghcr.io failed: {login_result.stderr}")
+    def check_for_image():
+        try:
+            return registry.manifest_exists(image_name, tag)
+        except requests.exceptions.RequestException as e:
+            print(f"Registry request failed: {e}")
             return False
 
-        print(f"Waiting for up to {CONFIG['timeout']} seconds for image {full_image_name} to be published...")
+    if _run_with_timeout(check_for_image, CONFIG["timeout"], CONFIG["poll_interval"]):
+        print(f"Test PASSED: Docker image {full_image_name} found.")
+        return True
+    else:
+        print(f"Test FAILED: Docker image {full_image_name} not found after {CONFIG['timeout']} seconds.")
+        return False
+
 
-        def check_for_image():
-            inspect_command = ["docker", "manifest", "inspect", full_image_name]
-            inspect_result = subprocess.run(inspect_command, capture_output=True, text=True)
-            return inspect_result.returncode == 0
+def _format_delta(current: int | None, previous: int | None) -> str:
+    if current is None or previous is None:
+        return "?"
+    return f"{(current - previous) / (1024 * 1024):+.1f} MiB"
 
-        if _run_with_timeout(check_for_image, CONFIG["timeout"], CONFIG["poll_interval"]):
-            print(f"Test PASSED: Docker image {full_image_name} found.")
-            subprocess.run(["docker", "logout", "ghcr.io"], capture_output=True)  # Logout on success
-            return True
-        else:
-            subprocess.run(["docker", "logout", "ghcr.io"], capture_output=True)  # Logout on timeout
-            print(f"Test FAILED: Docker image {full_image_name} not found after {CONFIG['timeout']} seconds.")
-            return False
 
-    except FileNotFoundError:
-        print("Test FAILED: `docker` command not found. Please ensure Docker is installed and in your PATH.")
+def check_image_size_budget(image_name: str, tag: str, gh: GithubContext, previous_tag: str | None = None) -> bool:
+    """
+    Checks ghcr.io/{image_name}:{tag} against the size and layer budget in CONFIG and
+    reports the growth against `previous_tag` (e.g. the image of the parent commit).
+    The uncompressed budget only applies with CONFIG["image_measure_uncompressed"].
+    """
+    from .images import LayerSizeCache, inspect_image
+    from .registry import registry_client
+
+    print(f"--- Running Test: Check size of Docker image ghcr.io/{image_name}:{tag} ---")
+    registry = registry_client("ghcr.io", CONFIG["sa_login"], gh.token)
+    measure = CONFIG["image_measure_uncompressed"]
+    size_cache = LayerSizeCache(CONFIG["layer_size_cache"]) if measure and CONFIG["layer_size_cache"] else None
+
+    def inspect(reference: str):
+        return inspect_image(registry, image_name, reference, size_cache, measure,
+                             CONFIG["image_measure_max_layer_bytes"])
+
+    try:
+        stats = inspect(tag)
+        previous = None
+        if previous_tag and registry.manifest_exists(image_name, previous_tag):
+            previous = inspect(previous_tag)
+    except (requests.exceptions.RequestException, KeyError, ValueError, zlib.error) as e:
+        print(f"Test FAILED: Could not inspect the image: {e}")
         return False
-    except Exception as e:
-        print(f"Test FAILED: An error occurred during Docker CLI operations: {e}")
+
+    if stats.uncompressed is not None:
+        uncompressed = f"{stats.uncompressed / (1024 * 1024):.1f} MiB"
+    elif measure:
+        unmeasured = sum(layer.uncompressed is None for layer in stats.layers)
+        uncompressed = f"unknown ({unmeasured} layers not measured)"
+    else:
+        uncompressed = "not measured"
+    print(f"Image has {len(stats.layers)} layers, {stats.compressed / (1024 * 1024):.1f} MiB compressed, "
+          f"{uncompressed} uncompressed.")
+    if previous is not None:
+        print(f"Change against {previous_tag}: {_format_delta(stats.compressed, previous.compressed)} compressed, "
+              f"{_format_delta(stats.uncompressed, previous.uncompressed)} uncompressed, "
+              f"{len(stats.layers) - len(previous.layers):+d} layers.")
+    else:
+        print("No previous image to compare with.")
+
+    problems = []
+    if stats.compressed > CONFIG["image_max_compressed_bytes"]:
+        problems.append(f"compressed size exceeds {CONFIG['image_max_compressed_bytes']} bytes")
+    if stats.uncompressed is not None and stats.uncompressed > CONFIG["image_max_uncompressed_bytes"]:
+        problems.append(f"uncompressed size exceeds {CONFIG['image_max_uncompressed_bytes']} bytes")
+    if len(stats.layers) > CONFIG["image_max_layers"]:
+        problems.append(f"more than {CONFIG['image_max_layers']} layers")
+
+    if problems:
+        print(f"Test FAILED: Image is over budget: {', '.join(problems)}. Layers (compressed, uncompressed, created by):")
+        print(stats.breakdown())
         return False
+    print("Test PASSED: Image is within the size budget.")
+    return True
 
 
-def check_tests_passed(repo_name: str, commit_sha: str, github_token: str) -> bool:
-    print(f"--- Running Test: Check for test results artifact for commit {commit_sha} in repo {repo_name} ---")
-    g = Github(github_token)
-    repo = g.get_repo(repo_name)
+def check_tests_passed(repo_name: str, commit_sha: str, gh: GithubContext) -> bool:
+    import zipfile
+    import xml.etree.ElementTree as ET
+    from .artifacts import ArtifactCache, summarize_artifacts
 
-    def find_run_by_commit():
-        runs = repo.get_workflow_runs(head_sha=commit_sha)
-        return runs[0] if runs.totalCount > 0 else None
+    print(f"--- Running Test: Check for test results artifact for commit {commit_sha} in repo {repo_name} ---")
+    repo = gh.get_repo(repo_name)
 
-    workflow_run = _get_workflow_run(repo, find_run_by_commit)
+    workflow_run = _get_workflow_run(repo, _commit_run_finder(repo, commit_sha), gh.runs, ("sha", commit_sha))
 
     if not workflow_run:
         print("Test FAILED: No workflow run found for the commit.")
@@ -326,61 +492,42 @@ def check_tests_passed(repo_name: str, commit_sha: str, github_token: str) -> bo
         print(f"Test FAILED: Workflow run conclusion is '{workflow_run.conclusion}'.")
         return False
 
-    artifacts = workflow_run.get_artifacts()
-    test_result_artifact = None
-    for artifact in artifacts:
-        if artifact.name == "test_result":
-            test_result_artifact = artifact
-            break
+    pattern = CONFIG["test_artifact_pattern"]
+    report_artifacts = [artifact for artifact in gh.runs.artifacts(workflow_run) if fnmatch(artifact.name, pattern)]
 
-    if not test_result_artifact:
-        print("Test FAILED: No 'test_result' artifact found.")
+    if not report_artifacts:
+        print(f"Test FAILED: No artifact matching '{pattern}' found.")
         return False
 
-    print("Found 'test_result' artifact. Downloading and inspecting...")
+    names = ", ".join(f"'{artifact.name}'" for artifact in report_artifacts)
+    print(f"Found test result artifact(s) {names}. Downloading and inspecting...")
 
     # The archive_download_url is a temporary URL to download the artifact
     # It requires authentication, which is handled by passing the token in the headers
-    headers = {'Authorization': f'token {github_token}'}
-    response = requests.get(test_result_artifact.archive_download_url, headers=headers, allow_redirects=True)
-    
     try:
-        response.raise_for_status()
-        zip_bytes = io.BytesIO(response.content)
-
-        with zipfile.ZipFile(zip_bytes) as z:
-            for filename in z.namelist():
-                if filename.endswith('.xml'):
-                    with z.open(filename) as xml_file:
-                        tree = ET.parse(xml_file)
-                        root = tree.getroot()
-                        
-                        for testsuite in root.iter('testsuite'):
-                            errors = testsuite.get('errors')
-                            failures = testsuite.get('failures')
-                            skipped = testsuite.get('skipped')
-                            tests = testsuite.get('tests')
-                            
-                            if errors == "0" and failures == "0" and tests and int(tests) > 0:
-                                print(f"Test PASSED: Found testsuite with errors={errors}, failures={failures}, skipped={skipped}, tests={tests}")
-                                return True
-        
-        print("Test FAILED: No valid test suite found in the test_result artifact.")
+        cache = ArtifactCache(CONFIG["artifact_cache_dir"], CONFIG["artifact_cache_max_bytes"]) if CONFIG["artifact_cache_dir"] else None
+        summary = summarize_artifacts(report_artifacts, gh.token, CONFIG["artifact_max_bytes"], CONFIG["artifact_workers"], cache)
+
+        if summary.passed:
+            print(f"Test PASSED: {summary}")
+            return True
+
+        print(f"Test FAILED: Test results in the artifacts are not passing: {summary}")
         return False
 
-    except (requests.exceptions.RequestException, zipfile.BadZipFile, ET.ParseError) as e:
+    except (requests.exceptions.RequestException, zipfile.BadZipFile, ET.ParseError, ValueError) as e:
         print(f"Test FAILED: An error occurred while processing the artifact: {e}")
         return False
 
 
-def push_and_check_workflow(ci_commit: CICommit, repo_name: str, commit_sha: str, github_token: str) -> bool:
+def push_and_check_workflow(ci_commit: CICommit, repo_name: str, commit_sha: str, gh: GithubContext) -> bool:
     """
     Pushes a commit and then checks for the success of the triggered workflow.
     """
     print("--- Pushing commit to trigger workflow ---")
     ci_commit.push_to_autotest_branch()
     print("--- Commit pushed, now checking for workflow run ---")
-    return check_workflow_run_success(repo_name, commit_sha, github_token)
+    return check_workflow_run_success(repo_name, commit_sha, gh)
 
 def make_hashable(obj):
     if isinstance(obj, dict):
@@ -390,7 +537,7 @@ def make_hashable(obj):
     else:
         return obj
 
-def check_release_updates_data(app_api, app_url: str, repo_name: str, github_token: str, commit_sha: str) -> bool:
+def check_release_updates_data(app_api, app_url: str, repo_name: str, gh: GithubContext, commit_sha: str) -> bool:
     print(f"--- Running Test: Check if a new release triggers a data update for repo {repo_name} ---")
     try:
         # 1. Get initial data
@@ -412,20 +559,13 @@ def check_release_updates_data(app_api, app_url: str, repo_name: str, github_tok
              return False
 
         # 4. Create a release
-        g = Github(github_token)
-        repo = g.get_repo(repo_name)
+        repo = gh.get_repo(repo_name)
         tag_name = time.strftime("ci-%Y%m%d-%H%M%S")
+        released_at = datetime.now(timezone.utc)
         repo.create_git_ref(ref=f'refs/tags/{tag_name}', sha=commit_sha)
         repo.create_git_release(tag=tag_name, name=f"Release {tag_name}", message="Automated release for testing deployment.")
         
-        def find_run_by_release_tag():
-            runs = repo.get_workflow_runs(event='release')
-            for run in runs:
-                if run.head_branch == tag_name:
-                    return run
-            return None
-
-        if not _wait_for_workflow_run(repo, find_run_by_release_tag):
+        if not _wait_for_workflow_run(repo, _release_run_finder(repo, tag_name, released_at), gh.runs, ("tag", tag_name)):
             print("Test FAILED: The release did not trigger a successful CD workflow.")
             return False
 
@@ -447,3 +587,25 @@ def check_release_updates_data(app_api, app_url: str, repo_name: str, github_tok
         print(f"Test FAILED: An error occurred: {e}")
         return False
 
+
+def collect_stale_refs(gh: GithubContext, repo_name: str, branch: str, ci_commit=None) -> int:
+    """
+    Applies the retention policy from CONFIG to the autotest branches, ci-* tags and
+    releases the checks left in the student's repository. Meant to run after a successful
+    run; errors are reported but never fail the run.
+    """
+    from .retention import RetentionPolicy, collect_garbage
+
+    policy = RetentionPolicy(
+        keep_last=CONFIG["retention_keep_last"],
+        max_age=timedelta(days=CONFIG["retention_max_age_days"]),
+        dry_run=CONFIG["retention_dry_run"],
+    )
+    print(f"--- Cleaning up stale autotest branches and ci-* releases of {repo_name} ---")
+    try:
+        deleted = collect_garbage(gh.get_repo(repo_name), branch, policy, ci_commit)
+    except Exception as e:
+        print(f"Cleanup failed: {e}")
+        return 0
+    print(f"{'Found' if policy.dry_run else 'Deleted'} {deleted} stale branches, tags and releases.")
+    return deleted
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from html.parser import HTMLParser
+
+import requests
+
+CHUNK_SIZE = 8 * 1024
+
+_INFO_KEY = re.compile(r'"info"\s*:\s*')
+
+
+def _text_chunks(response: requests.Response, seen: bytearray | None):
+    """Decodes a streamed response chunk by chunk; `seen` collects the raw bytes read."""
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        if seen is not None:
+            seen.extend(chunk)
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+class _MetaFinder(HTMLParser):
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.content = None
+        self.found = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta" and not self.found:
+            attributes = dict(attrs)
+            if attributes.get("name") == self.name:
+                self.content = attributes.get("content")
+                self.found = True
+
+    handle_startendtag = handle_starttag
+
+
+def find_meta_content(response: requests.Response, name: str, seen: bytearray | None = None) -> str | None:
+    """
+    Returns the content of `<meta name="{name}">` from a response opened with stream=True.
+
+    The page is fed to an incremental HTML parser chunk by chunk, and the connection is
+    closed as soon as the tag is seen, usually within the first chunk of <head>. Only
+    if the incremental parse fails is the page parsed as a whole with BeautifulSoup.
+    """
+    finder = _MetaFinder(name)
+    body = []
+    chunks = _text_chunks(response, seen)
+    try:
+        for text in chunks:
+            body.append(text)
+            finder.feed(text)
+            if finder.found:
+                return finder.content
+        finder.close()
+        return finder.content
+    except (AssertionError, ValueError):
+        from bs4 import BeautifulSoup
+        body.extend(chunks)
+        meta_tag = BeautifulSoup("".join(body), "html.parser").find("meta", attrs={"name": name})
+        return meta_tag.get("content") if meta_tag else None
+    finally:
+        response.close()
+
+
+def find_openapi_description(response: requests.Response) -> str | None:
+    """
+    Returns `info.description` of an OpenAPI/Swagger JSON document opened with stream=True.
+
+    The `info` object comes first in generated documents, so it is decoded on its own
+    as soon as it is complete and the rest of the document is never downloaded. Documents
+    where that is not the case are parsed in full.
+    """
+    buffer = ""
+    decoder = json.JSONDecoder()
+    chunks = _text_chunks(response, None)
+    try:
+        for text in chunks:
+            buffer += text
+            match = _INFO_KEY.search(buffer)
+            if not match:
+                continue
+            try:
+                info, _ = decoder.raw_decode(buffer, match.end())
+            except ValueError:
+                continue  # the info object is not complete yet
+            # A top-level info object has the required title and version.
+            if isinstance(info, dict) and "title" in info and "version" in info:
+                return info.get("description")
+            break
+        buffer += "".join(chunks)
+        document = json.loads(buffer)
+        return document.get("info", {}).get("description") if isinstance(document, dict) else None
+    finally:
+        response.close()
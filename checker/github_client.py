@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+from github import Auth, Consts, Github
+from github.Repository import Repository
+from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass, Requester
+
+from .http_cache import CachingAdapter, HTTPCache
+from .rate_limit import RateLimitScheduler, current_priority
+
+MAX_RATE_LIMIT_RETRIES = 3
+# Page size of listings. The checks read server-side filtered lists (runs of one
+# commit or tag, artifacts of one run), so a small page is one request either way.
+PER_PAGE = 10
+
+_http_cache = None
+_scheduler = None
+_sessions = {}
+
+
+def _shared_session(connection) -> requests.Session:
+    """
+    Returns the process-wide session for the connection's host.
+
+    PyGithub stops reusing connection objects once custom connection classes are
+    injected, so the session (and its keep-alive pool) is kept here instead.
+    """
+    key = (connection.protocol, connection.host, connection.port)
+    if key not in _sessions:
+        session = requests.Session()
+        session.auth = Requester.noopAuth
+        adapter_args = dict(
+            max_retries=connection.retry,
+            pool_connections=connection.pool_size,
+            pool_maxsize=connection.pool_size,
+        )
+        adapter = CachingAdapter(_http_cache, **adapter_args) if _http_cache else HTTPAdapter(**adapter_args)
+        session.mount(f"{connection.protocol}://", adapter)
+        _sessions[key] = session
+    return _sessions[key]
+
+
+class _SharedConnectionMixin:
+    """
+    Connection object for PyGithub that uses the shared session and, if enabled,
+    asks the rate limit scheduler before every request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session.close()
+        self.session = _shared_session(self)
+
+    def getresponse(self):
+        if _scheduler is None:
+            return super().getresponse()
+        attempt = 0
+        while True:
+            _scheduler.acquire(current_priority())
+            response = super().getresponse()
+            wait = _scheduler.record_response(response.status, response.headers)
+            # Streamed request bodies cannot be replayed.
+            if wait is None or wait > _scheduler.max_wait or hasattr(self.input, "read") \
+                    or attempt == MAX_RATE_LIMIT_RETRIES:
+                return response
+            attempt += 1
+            print(f"GitHub rate limit hit, retrying in {int(wait)}s...")
+
+    def close(self):
+        pass
+
+
+class GithubHTTPSConnection(_SharedConnectionMixin, HTTPSRequestsConnectionClass):
+    pass
+
+
+class GithubHTTPConnection(_SharedConnectionMixin, HTTPRequestsConnectionClass):
+    pass
+
+
+def _install_connection_classes():
+    _sessions.clear()
+    Requester.injectConnectionClasses(GithubHTTPConnection, GithubHTTPSConnection)
+
+
+def enable_http_cache(directory: str):
+    """
+    Routes every PyGithub request through a disk-backed cache in `directory`.
+    Cached GET responses are revalidated with If-None-Match/If-Modified-Since;
+    GitHub does not count 304 answers against the rate limit.
+    """
+    global _http_cache
+    if _http_cache is None or _http_cache.directory != directory:
+        _http_cache = HTTPCache(directory)
+    _install_connection_classes()
+
+
+def enable_rate_limit_scheduler(state_path: str):
+    """
+    Sends every PyGithub request through a RateLimitScheduler whose state is kept
+    in `state_path`, shared with other check runs on the same host.
+    """
+    global _scheduler
+    if _scheduler is None or _scheduler.state_path != state_path:
+        _scheduler = RateLimitScheduler(state_path)
+    _install_connection_classes()
+
+
+class WorkflowRunRegistry:
+    """
+    Completed workflow runs of the current check run, keyed by what the checks look them
+    up by: `("sha", head_sha)` or `("tag", release_tag)`. Artifact lists are memoized per run.
+    """
+
+    def __init__(self):
+        self._runs = {}
+        self._artifacts = {}
+
+    def get(self, key: tuple):
+        return self._runs.get(key)
+
+    def put(self, key: tuple, workflow_run):
+        self._runs[key] = workflow_run
+
+    def artifacts(self, workflow_run) -> list:
+        if workflow_run.id not in self._artifacts:
+            self._artifacts[workflow_run.id] = list(workflow_run.get_artifacts())
+        return self._artifacts[workflow_run.id]
+
+
+class GithubContext:
+    """
+    Per-run access to the GitHub API shared by all checks.
+
+    Owns a single Github client, so every check reuses the same pooled keep-alive
+    connection, memoizes repository handles and keeps a registry of completed
+    workflow runs. Handles are lazy: they are built without a `GET /repos/{name}`
+    call, requests are only sent for the data the checks actually read.
+    """
+
+    def __init__(self, token: str, cache_dir: str | None = None, rate_limit_state: str | None = None,
+                 pool_size: int = 10, base_url: str = Consts.DEFAULT_BASE_URL, per_page: int = PER_PAGE):
+        if cache_dir:
+            enable_http_cache(cache_dir)
+        if rate_limit_state:
+            enable_rate_limit_scheduler(rate_limit_state)
+        self.token = token
+        self.github = Github(auth=Auth.Token(token), base_url=base_url, pool_size=pool_size,
+                             per_page=per_page, lazy=True)
+        self._repos = {}
+        self.runs = WorkflowRunRegistry()
+
+    def get_repo(self, repo_name: str) -> Repository:
+        if repo_name not in self._repos:
+            self._repos[repo_name] = self.github.get_repo(repo_name)
+        return self._repos[repo_name]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+# The cached body is stored decoded, so transfer-level headers must not be replayed.
+_TRANSFER_HEADERS = ("Content-Length", "Content-Encoding", "Transfer-Encoding")
+
+
+def _replayable_headers(headers) -> dict:
+    return {k: v for k, v in headers.items() if k.title() not in _TRANSFER_HEADERS}
+
+
+class HTTPCache:
+    """
+    Disk-backed store of GET responses that carry an ETag or Last-Modified validator.
+
+    Entries not used for `max_age_days` are dropped when the cache is opened.
+    Every entry is a single file: a JSON header line (url and headers) followed by
+    the raw body. Files are written atomically, so several processes can share a directory.
+    """
+
+    def __init__(self, directory: str, max_age_days: int = 7):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self._prune(max_age_days * 24 * 3600)
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> str:
+        # Different tokens may see different data, so the credentials are part of the key.
+        auth = request.headers.get("Authorization", "")
+        raw = f"{request.method} {request.url} {auth}".encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def load(self, key: str) -> tuple[dict, bytes] | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def store(self, key: str, response: requests.Response):
+        meta = {"url": response.url, "headers": _replayable_headers(response.headers)}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode() + b"\n")
+                f.write(response.content)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _prune(self, max_age: float):
+        threshold = time.time() - max_age
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            try:
+                if os.path.getmtime(path) < threshold:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter that revalidates cached GET responses with conditional requests.
+    A 304 answer is turned back into the cached 200 response, so callers never see it.
+    """
+
+    def __init__(self, cache: HTTPCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        # Requests that already carry validators are conditional on purpose; leave them alone.
+        if request.method != "GET" or "If-None-Match" in request.headers or "If-Modified-Since" in request.headers:
+            return super().send(request, **kwargs)
+
+        key = self.cache.key(request)
+        cached = self.cache.load(key)
+        if cached:
+            meta, _ = cached
+            headers = CaseInsensitiveDict(meta["headers"])
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and cached:
+            return self._from_cache(request, response, *cached)
+        if response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+            self.cache.store(key, response)
+        return response
+
+    @staticmethod
+    def _from_cache(request, not_modified: requests.Response, meta: dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = meta["url"]
+        response.request = request
+        response.connection = not_modified.connection
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        # Rate limit and date headers of the 304 are newer than the cached ones.
+        response.headers.update(_replayable_headers(not_modified.headers))
+        response.headers["X-From-Cache"] = "revalidated"
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
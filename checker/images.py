@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import zlib
+from dataclasses import dataclass, field
+
+from .registry import RegistryClient
+
+INDEX_MEDIA_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+)
+DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class LayerInfo:
+    digest: str
+    compressed: int
+    uncompressed: int | None
+    created_by: str = ""
+
+
+@dataclass
+class ImageStats:
+    """Sizes of one image; `uncompressed` is None if any layer's size is unknown (e.g. zstd layers)."""
+    reference: str
+    layers: list[LayerInfo] = field(default_factory=list)
+
+    @property
+    def compressed(self) -> int:
+        return sum(layer.compressed for layer in self.layers)
+
+    @property
+    def uncompressed(self) -> int | None:
+        sizes = [layer.uncompressed for layer in self.layers]
+        return None if None in sizes else sum(sizes)
+
+    def breakdown(self) -> str:
+        lines = []
+        for layer in self.layers:
+            uncompressed = _format_size(layer.uncompressed) if layer.uncompressed is not None else "?"
+            lines.append(f"  {layer.digest[:19]}  {_format_size(layer.compressed):>10}  {uncompressed:>10}  {layer.created_by[:80]}")
+        return "\n".join(lines)
+
+
+def _format_size(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+class LayerSizeCache:
+    """
+    Uncompressed sizes of layers by digest, kept in a JSON file. Layers are immutable,
+    so base image layers shared by every student image are only measured once.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.sizes = json.load(f)
+        except (OSError, ValueError):
+            self.sizes = {}
+
+    def get(self, digest: str) -> int | None:
+        return self.sizes.get(digest)
+
+    def put(self, digest: str, size: int):
+        self.sizes[digest] = size
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.sizes, f)
+        os.replace(tmp_path, self.path)
+
+
+def _is_uncompressed(layer: dict) -> bool:
+    return layer.get("mediaType", "").endswith(".tar")
+
+
+def _uncompressed_size(client: RegistryClient, repository: str, layer: dict) -> int | None:
+    """Streams a layer blob through the decompressor and counts the output bytes."""
+    if _is_uncompressed(layer):
+        return layer["size"]
+    if not layer.get("mediaType", "").endswith("gzip"):
+        return None
+
+    response = client.request("GET", repository, f"blobs/{layer['digest']}", stream=True)
+    try:
+        response.raise_for_status()
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        size = 0
+        for chunk in response.iter_content(chunk_size=DECOMPRESS_CHUNK_SIZE):
+            # Bounded output per call, highly compressible layers must not blow up memory.
+            while chunk:
+                size += len(decompressor.decompress(chunk, DECOMPRESS_CHUNK_SIZE))
+                chunk = decompressor.unconsumed_tail
+        return size + len(decompressor.flush())
+    finally:
+        response.close()
+
+
+def get_manifest(client: RegistryClient, repository: str, reference: str,
+                 platform: tuple[str, str] = ("linux", "amd64")) -> dict:
+    """Fetches an image manifest; for multi-platform indexes the manifest of `platform`."""
+    manifest = client.get_json(repository, f"manifests/{reference}")
+    if manifest.get("mediaType") in INDEX_MEDIA_TYPES or "manifests" in manifest:
+        entries = manifest["manifests"]
+        chosen = next((m for m in entries
+                       if (m.get("platform", {}).get("os"), m.get("platform", {}).get("architecture")) == platform),
+                      entries[0])
+        manifest = client.get_json(repository, f"manifests/{chosen['digest']}")
+    return manifest
+
+
+def inspect_image(client: RegistryClient, repository: str, reference: str,
+                  size_cache: LayerSizeCache | None = None, measure_uncompressed: bool = False,
+                  max_layer_bytes: int | None = None) -> ImageStats:
+    """
+    Reads the manifest and config of an image. Compressed sizes and the layer count come
+    from the manifest alone. Uncompressed sizes cost a download of each layer, so they
+    are only measured with `measure_uncompressed`, and layers bigger than `max_layer_bytes`
+    (compressed) are skipped and left unknown.
+    """
+    manifest = get_manifest(client, repository, reference)
+    config = client.get_json(repository, f"blobs/{manifest['config']['digest']}")
+    # Instructions that created layers, in layer order (ENV, LABEL etc. create none).
+    history = [entry.get("created_by", "") for entry in config.get("history", []) if not entry.get("empty_layer")]
+
+    stats = ImageStats(reference)
+    for index, layer in enumerate(manifest.get("layers", [])):
+        uncompressed = layer["size"] if _is_uncompressed(layer) else None
+        if uncompressed is None and measure_uncompressed:
+            uncompressed = size_cache.get(layer["digest"]) if size_cache is not None else None
+            if uncompressed is None and (max_layer_bytes is None or layer["size"] <= max_layer_bytes):
+                uncompressed = _uncompressed_size(client, repository, layer)
+                if size_cache is not None and uncompressed is not None:
+                    size_cache.put(layer["digest"], uncompressed)
+        created_by = history[index] if index < len(history) else ""
+        stats.layers.append(LayerInfo(layer["digest"], layer["size"], uncompressed, created_by))
+    return stats
@@ -0,0 +1,103 @@
+import contextlib
+import fcntl
+import hashlib
+import os
+import shutil
+import time
+
+import pygit2
+
+
+class MirrorCache:
+    """
+    Persistent bare mirrors of student repositories, one per repository URL.
+
+    A mirror keeps the full history of every branch fetched through it, so later runs
+    only transfer the commits pushed since. Per-run repositories borrow the mirror's
+    objects through `objects/info/alternates` instead of copying them.
+
+    Each mirror has a lock file; fetching into a mirror takes it exclusively, so runs
+    sharing the directory serialize their updates. Once the cache exceeds `max_bytes`,
+    mirrors are evicted least-recently-used first, except those used within `min_age`
+    seconds: runs that are still going may read objects from them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, min_age: float = 24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, repo_url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(repo_url.encode()).hexdigest()[:32] + ".git")
+
+    @contextlib.contextmanager
+    def _locked(self, path: str, blocking: bool = True):
+        with open(path + ".lock", "a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def update(self, repo_url: str, branch: str, callbacks: pygit2.RemoteCallbacks) -> pygit2.Repository:
+        """
+        Creates or incrementally updates the mirror of `repo_url` with `branch`,
+        stored as refs/heads/<branch> of the mirror.
+        """
+        path = self._path(repo_url)
+        with self._locked(path):
+            if os.path.isdir(path):
+                mirror = pygit2.Repository(path)
+                print(f"Updating mirror of {repo_url} in {path}")
+            else:
+                mirror = pygit2.init_repository(path, bare=True)
+                mirror.remotes.create("origin", repo_url, "+refs/heads/*:refs/heads/*")
+                print(f"Creating mirror of {repo_url} in {path}")
+            mirror.remotes["origin"].fetch([f"+refs/heads/{branch}:refs/heads/{branch}"], callbacks=callbacks)
+            os.utime(path)
+        self._evict(keep=path)
+        return mirror
+
+    def fetch_branch(self, repo_url: str, branch: str, path: str, callbacks: pygit2.RemoteCallbacks) -> pygit2.Repository:
+        """
+        Same contract as utils.fetch_branch: a new bare repository at `path` with the
+        branch tip as refs/remotes/origin/<branch>, but objects come from the mirror.
+        """
+        mirror = self.update(repo_url, branch, callbacks)
+        repo = pygit2.init_repository(path, bare=True)
+        with open(os.path.join(path, "objects", "info", "alternates"), "w") as f:
+            f.write(os.path.join(os.path.abspath(mirror.path), "objects") + "\n")
+        repo = pygit2.Repository(path)
+        repo.remotes.create("origin", repo_url, f"+refs/heads/{branch}:refs/remotes/origin/{branch}")
+        repo.references.create(f"refs/remotes/origin/{branch}", mirror.references[f"refs/heads/{branch}"].target)
+        return repo
+
+    def _evict(self, keep: str):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".git") or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+            entries.append((os.path.getmtime(path), size, path))
+
+        total = sum(size for _, size, _ in entries)
+        threshold = time.time() - self.min_age
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes or mtime >= threshold:
+                break
+            if path == keep:
+                continue
+            with self._locked(path, blocking=False) as locked:
+                if not locked:
+                    continue
+                print(f"Evicting mirror {path}")
+                # The lock file stays: a run blocked on it holds the same inode, and
+                # removing it would let a later run lock a new file at the same time.
+                shutil.rmtree(path, ignore_errors=True)
+            total -= size
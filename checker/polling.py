@@ -0,0 +1,64 @@
+import random
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+
+class PollStrategy(ABC):
+    """
+    Describes how long to sleep between consecutive polls of a condition.
+    """
+    @abstractmethod
+    def delays(self) -> Iterator[float]:
+        ...
+
+
+class FixedPollStrategy(PollStrategy):
+    """Sleeps the same interval between every poll."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    def delays(self) -> Iterator[float]:
+        while True:
+            yield self.interval
+
+
+class BackoffPollStrategy(PollStrategy):
+    """
+    Starts with short delays and grows them exponentially up to `maximum`.
+    Every delay is randomly spread by +/- `jitter` (a fraction of the delay)
+    and never drops below `minimum`.
+    """
+
+    def __init__(self, initial: float, maximum: float, factor: float = 2.0, jitter: float = 0.1, minimum: float = 0.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.minimum = minimum
+
+    def delays(self) -> Iterator[float]:
+        delay = self.initial
+        while True:
+            spread = delay * random.uniform(-self.jitter, self.jitter)
+            yield max(self.minimum, min(self.maximum, delay + spread))
+            delay = min(delay * self.factor, self.maximum)
+
+
+def make_poll_strategy(name: str, poll_interval: float) -> PollStrategy:
+    """
+    Builds a poll strategy by name from the configured poll interval.
+
+    "fixed" keeps the classic behaviour of sleeping `poll_interval` every time.
+    "backoff" polls eight times faster at first and backs off to twice the poll
+    interval, so quick deploys are noticed sooner while long ones cost fewer requests.
+    """
+    if name == "fixed":
+        return FixedPollStrategy(poll_interval)
+    if name == "backoff":
+        return BackoffPollStrategy(
+            initial=poll_interval / 8,
+            maximum=poll_interval * 2,
+            minimum=min(1.0, poll_interval),
+        )
+    raise ValueError(f"Unknown poll strategy '{name}'")
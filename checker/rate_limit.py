@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import fcntl
+import json
+import os
+import time
+from email.utils import parsedate_to_datetime
+
+HIGH_PRIORITY = 0
+LOW_PRIORITY = 1
+
+_priority = contextvars.ContextVar("github_request_priority", default=HIGH_PRIORITY)
+
+
+@contextlib.contextmanager
+def low_priority():
+    """Marks GitHub requests made inside the block (typically status polls) as deferrable."""
+    token = _priority.set(LOW_PRIORITY)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+def _retry_after_seconds(value: str, now: float) -> float | None:
+    """Parses Retry-After, either delay seconds or an HTTP-date; None if it is neither."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitScheduler:
+    """
+    Token bucket in front of GitHub API requests, shared by every process on the host.
+
+    The bucket lives in a small JSON state file guarded by an exclusive file lock, so
+    concurrent check runs that use the same service account throttle each other.
+    Besides the local bucket, the state tracks the last seen `X-RateLimit-*` headers
+    and a `Retry-After` pause that applies to all processes.
+
+    Low-priority requests only go out while more than `low_priority_reserve` tokens are
+    left and the API budget is above `low_priority_reserve`, so polls yield to requests
+    that make progress (creating refs, releases, downloads).
+    """
+
+    def __init__(self, state_path: str, rate: float = 5.0, burst: int = 10,
+                 low_priority_reserve: int = 5, max_wait: float = 60.0):
+        self.state_path = state_path
+        self.rate = rate
+        self.burst = burst
+        self.low_priority_reserve = low_priority_reserve
+        self.max_wait = max_wait
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked_state(self):
+        with open(self.state_path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _try_acquire(self, state: dict, priority: int, now: float) -> float:
+        """Takes a token if possible and returns 0, otherwise returns how long to wait."""
+        blocked_until = state.get("blocked_until", 0)
+        if blocked_until > now:
+            return blocked_until - now
+
+        tokens = min(self.burst, state.get("tokens", self.burst) + (now - state.get("updated", now)) * self.rate)
+        state["tokens"] = tokens
+        state["updated"] = now
+
+        remaining, reset = state.get("remaining"), state.get("reset", 0)
+        if remaining is not None and reset > now:
+            reserve = self.low_priority_reserve if priority == LOW_PRIORITY else 0
+            if remaining <= reserve:
+                return reset - now
+
+        needed = 1 + (self.low_priority_reserve if priority == LOW_PRIORITY else 0)
+        needed = min(needed, self.burst)
+        if tokens >= needed:
+            state["tokens"] = tokens - 1
+            if remaining is not None:
+                state["remaining"] = remaining - 1
+            return 0
+        return (needed - tokens) / self.rate
+
+    def acquire(self, priority: int = HIGH_PRIORITY):
+        """
+        Blocks until the request may be sent. After `max_wait` seconds the request is let
+        through anyway, so an exhausted budget surfaces as a GitHub error instead of a hang.
+        """
+        deadline = time.time() + self.max_wait
+        while True:
+            now = time.time()
+            with self._locked_state() as state:
+                wait = self._try_acquire(state, priority, now)
+            if wait <= 0 or now >= deadline:
+                return
+            time.sleep(min(wait, deadline - now))
+
+    def record_response(self, status: int, headers) -> float | None:
+        """
+        Updates the shared state from a response.
+
+        :return: Seconds to wait before retrying if the request was rate limited, None otherwise.
+        """
+        now = time.time()
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+
+        wait = None
+        if status in (403, 429):
+            if retry_after is not None:
+                wait = _retry_after_seconds(retry_after, now)
+            if wait is None and remaining == "0" and reset is not None:
+                wait = max(0.0, float(reset) - now)
+            elif wait is None and status == 429:
+                wait = 60.0
+
+        with self._locked_state() as state:
+            if remaining is not None and reset is not None:
+                state["remaining"] = int(remaining)
+                state["reset"] = float(reset)
+            if wait is not None:
+                state["blocked_until"] = max(state.get("blocked_until", 0), now + wait)
+        return wait
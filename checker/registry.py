@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import re
+import time
+
+import requests
+
+MANIFEST_MEDIA_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+# Tokens are renewed this many seconds before they expire.
+TOKEN_EXPIRY_MARGIN = 10
+DEFAULT_TOKEN_LIFETIME = 60
+REQUEST_TIMEOUT = 30
+
+_clients = {}
+
+
+def _parse_challenge(header: str) -> dict:
+    """Parses `Bearer realm="...",service="...",scope="..."` into a dict."""
+    return dict(re.findall(r'(\w+)="([^"]*)"', header))
+
+
+class RegistryClient:
+    """
+    Minimal Docker Registry HTTP API v2 client, enough to check for images without
+    a Docker CLI or daemon.
+
+    Requests go over one keep-alive session. The bearer token for a repository scope
+    is requested from the realm of the registry's 401 challenge once, then reused
+    until shortly before it expires.
+    """
+
+    def __init__(self, registry: str, username: str | None = None, password: str | None = None,
+                 scheme: str = "https"):
+        self.base_url = f"{scheme}://{registry}"
+        self.auth = (username, password) if password else None
+        self.session = requests.Session()
+        self._tokens = {}
+
+    def _token(self, challenge: str) -> str:
+        params = _parse_challenge(challenge)
+        realm = params.pop("realm")
+        response = self.session.get(realm, params=params, auth=self.auth, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        lifetime = data.get("expires_in") or DEFAULT_TOKEN_LIFETIME
+        token = data.get("token") or data.get("access_token")
+        self._tokens[params.get("scope")] = (token, time.monotonic() + lifetime - TOKEN_EXPIRY_MARGIN)
+        return token
+
+    def request(self, method: str, repository: str, path: str, headers: dict | None = None,
+                stream: bool = False) -> requests.Response:
+        """Sends `method /v2/<repository>/<path>`, fetching a bearer token when challenged."""
+        scope = f"repository:{repository}:pull"
+        headers = dict(headers or {})
+        token, expires_at = self._tokens.get(scope, (None, 0))
+        if token and time.monotonic() < expires_at:
+            headers["Authorization"] = f"Bearer {token}"
+
+        url = f"{self.base_url}/v2/{repository}/{path}"
+        response = self.session.request(method, url, headers=headers, timeout=REQUEST_TIMEOUT, stream=stream)
+        challenge = response.headers.get("WWW-Authenticate", "")
+        if response.status_code == 401 and challenge.lower().startswith("bearer"):
+            response.close()
+            headers["Authorization"] = f"Bearer {self._token(challenge)}"
+            response = self.session.request(method, url, headers=headers, timeout=REQUEST_TIMEOUT, stream=stream)
+        return response
+
+    def get_json(self, repository: str, path: str) -> dict:
+        """GETs a manifest or a JSON blob (image config)."""
+        response = self.request("GET", repository, path, {"Accept": ", ".join(MANIFEST_MEDIA_TYPES)})
+        response.raise_for_status()
+        return response.json()
+
+    def manifest_exists(self, repository: str, reference: str) -> bool:
+        """Checks for a tag or digest with `HEAD /v2/<repository>/manifests/<reference>`."""
+        response = self.request("HEAD", repository, f"manifests/{reference}",
+                                {"Accept": ", ".join(MANIFEST_MEDIA_TYPES)})
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+
+def registry_client(registry: str, username: str | None = None, password: str | None = None) -> RegistryClient:
+    """Returns the process-wide client for these credentials, so tokens and connections are shared by all checks."""
+    key = (registry, username, password)
+    if key not in _clients:
+        _clients[key] = RegistryClient(registry, username, password)
+    return _clients[key]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import BinaryIO
+
+
+@dataclass
+class ReportSummary:
+    """Test counters aggregated over any number of suites and report files."""
+    tests: int = 0
+    failures: int = 0
+    errors: int = 0
+    skipped: int = 0
+    reports: int = 0
+
+    def add(self, other: "ReportSummary"):
+        self.tests += other.tests
+        self.failures += other.failures
+        self.errors += other.errors
+        self.skipped += other.skipped
+        self.reports += other.reports
+
+    @property
+    def passed(self) -> bool:
+        return self.tests > 0 and self.failures == 0 and self.errors == 0
+
+    def __str__(self) -> str:
+        return (f"tests={self.tests}, failures={self.failures}, errors={self.errors}, "
+                f"skipped={self.skipped} in {self.reports} report(s)")
+
+
+class _SuiteCounter:
+    def __init__(self, attrib: dict):
+        self.attrib = attrib
+        self.has_nested_suites = False
+        self.counted = ReportSummary()
+
+
+def _int_attr(attrib: dict, name: str) -> int:
+    return int(attrib.get(name) or 0)
+
+
+def parse_junit(xml_file: BinaryIO) -> ReportSummary:
+    """
+    Incrementally reads a JUnit XML report and returns its totals.
+
+    Only innermost <testsuite> elements are counted, so <testsuites> wrappers and
+    nested suites carrying their own totals are not counted twice. A suite's
+    attributes are used when present, otherwise its <testcase> children are counted.
+    Processed elements are detached from the tree, so memory stays flat no matter
+    how many test cases the report contains.
+
+    :raises xml.etree.ElementTree.ParseError: If the report is not well-formed.
+    """
+    summary = ReportSummary(reports=1)
+    suites = []
+    open_elements = []
+
+    for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "testsuite":
+                if suites:
+                    suites[-1].has_nested_suites = True
+                suites.append(_SuiteCounter(dict(elem.attrib)))
+            open_elements.append(elem)
+            continue
+
+        open_elements.pop()
+        if elem.tag == "testcase" and suites:
+            counted = suites[-1].counted
+            counted.tests += 1
+            for outcome in elem:
+                if outcome.tag == "failure":
+                    counted.failures += 1
+                elif outcome.tag == "error":
+                    counted.errors += 1
+                elif outcome.tag == "skipped":
+                    counted.skipped += 1
+        elif elem.tag == "testsuite":
+            suite = suites.pop()
+            if not suite.has_nested_suites:
+                if "tests" in suite.attrib:
+                    summary.add(ReportSummary(
+                        tests=_int_attr(suite.attrib, "tests"),
+                        failures=_int_attr(suite.attrib, "failures"),
+                        errors=_int_attr(suite.attrib, "errors"),
+                        skipped=_int_attr(suite.attrib, "skipped"),
+                    ))
+                else:
+                    summary.add(suite.counted)
+        else:
+            continue
+
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+    return summary
+
+
+def parse_trx(trx_file: BinaryIO) -> ReportSummary:
+    """
+    Reads the <ResultSummary><Counters> of a Visual Studio TRX report (dotnet test).
+    Tests that timed out or were aborted count as failures, not executed ones as skipped.
+    """
+    for _, elem in ET.iterparse(trx_file):
+        if elem.tag.rsplit("}", 1)[-1] == "Counters":
+            total = _int_attr(elem.attrib, "total")
+            return ReportSummary(
+                tests=total,
+                failures=sum(_int_attr(elem.attrib, name) for name in ("failed", "timeout", "aborted")),
+                errors=_int_attr(elem.attrib, "error"),
+                skipped=total - _int_attr(elem.attrib, "executed"),
+                reports=1,
+            )
+        elem.clear()
+    raise ValueError("TRX report has no result counters")
+
+
+def parse_pytest_json(json_file: BinaryIO) -> ReportSummary | None:
+    """
+    Reads the summary of a pytest-json-report file.
+    Returns None for JSON files that are not pytest reports (coverage data etc.).
+    """
+    report = json.load(json_file)
+    summary = report.get("summary") if isinstance(report, dict) else None
+    if not isinstance(summary, dict):
+        return None
+    return ReportSummary(
+        tests=summary.get("total", 0),
+        failures=summary.get("failed", 0),
+        errors=summary.get("error", 0),
+        skipped=summary.get("skipped", 0),
+        reports=1,
+    )
+
+
+REPORT_PARSERS = {
+    ".xml": parse_junit,
+    ".trx": parse_trx,
+    ".json": parse_pytest_json,
+}
+
+
+def parse_report(filename: str, report_file: BinaryIO) -> ReportSummary | None:
+    """Parses a report by its file extension; returns None for files that are not test reports."""
+    parser = REPORT_PARSERS.get(os.path.splitext(filename)[1].lower())
+    return parser(report_file) if parser else None
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .utils import CICommit
+
+# Timestamps are formatted by time.strftime in push_to_autotest_branch and the release checks.
+AUTOTEST_BRANCH = re.compile(r"_autotests(\d{12})$")
+CI_TAG = re.compile(r"^ci-(\d{8}-\d{6})$")
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    What to keep of the refs the checks create: the `keep_last` newest ones and any
+    younger than `max_age`. With `dry_run` nothing is deleted, only listed.
+    """
+    keep_last: int = 5
+    max_age: timedelta = timedelta(days=14)
+    dry_run: bool = False
+
+
+def select_stale(created: dict[str, datetime], policy: RetentionPolicy, now: datetime) -> list[str]:
+    """Returns the names in `created` the policy does not keep, oldest first."""
+    newest_first = sorted(created, key=created.get, reverse=True)
+    stale = [name for name in newest_first[policy.keep_last:] if now - created[name] > policy.max_age]
+    return stale[::-1]
+
+
+def _created_at(refs, pattern: re.Pattern, time_format: str) -> dict:
+    created = {}
+    for ref in refs:
+        match = pattern.search(ref.ref.rsplit("/", 1)[-1])
+        if match:
+            created[ref.ref] = datetime.strptime(match.group(1), time_format)
+    return created
+
+
+def collect_garbage(repo, branch: str, policy: RetentionPolicy, ci_commit=None) -> int:
+    """
+    Deletes stale `{branch}_autotests*` branches, `ci-*` tags and the releases of those tags.
+
+    Releases are deleted through the API one by one. Refs are deleted with a single git
+    push when `ci_commit` is a CICommit, otherwise one API request per ref.
+
+    :param repo: PyGithub repository of the student.
+    :return: The number of branches, tags and releases deleted (or listed in a dry run).
+    """
+    now = datetime.now()
+    branch_refs = {ref.ref: ref for ref in repo.get_git_matching_refs(f"heads/{branch}_autotests")}
+    tag_refs = {ref.ref: ref for ref in repo.get_git_matching_refs("tags/ci-")}
+    stale_refs = select_stale(_created_at(branch_refs.values(), AUTOTEST_BRANCH, "%Y%m%d%H%M"), policy, now)
+    stale_tags = select_stale(_created_at(tag_refs.values(), CI_TAG, "%Y%m%d-%H%M%S"), policy, now)
+    stale_refs += stale_tags
+
+    stale_tag_names = {ref.rsplit("/", 1)[-1] for ref in stale_tags}
+    stale_releases = [release for release in repo.get_releases() if release.tag_name in stale_tag_names]
+
+    action = "Would delete" if policy.dry_run else "Deleting"
+    for release in stale_releases:
+        print(f"{action} release '{release.tag_name}'")
+    for ref in stale_refs:
+        print(f"{action} {ref}")
+
+    if not policy.dry_run:
+        for release in stale_releases:
+            release.delete_release()
+        if isinstance(ci_commit, CICommit):
+            if stale_refs:
+                ci_commit.push_refs([f":{ref}" for ref in stale_refs])
+        else:
+            all_refs = {**branch_refs, **tag_refs}
+            for ref in stale_refs:
+                all_refs[ref].delete()
+
+    return len(stale_releases) + len(stale_refs)
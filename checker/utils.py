@@ -1,12 +1,139 @@
+from __future__ import annotations
+
+import atexit
+import fnmatch
+import re
+import shutil
+import subprocess
 import tempfile
-import pygit2
 import time
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 import os
 
+# pygit2 and PyGithub are imported where they are used: the app modules import this
+# module for its helpers, and the webhooks check may never touch the GitHub API.
+if TYPE_CHECKING:
+    import pygit2
+
+    from .mirrors import MirrorCache
+
+
+def fetch_branch(repo_url: str, branch: str, path: str, callbacks: pygit2.RemoteCallbacks, depth: int = 1,
+                 mirrors: MirrorCache | None = None) -> pygit2.Repository:
+    """
+    Fetches only `branch` into a new bare repository at `path`, by default just its tip
+    commit (depth 0 means full history). No working directory is materialised.
+    The fetched tip is available as refs/remotes/origin/<branch>.
+    With `mirrors`, the branch is fetched incrementally into the persistent mirror
+    instead and the new repository borrows its objects; `depth` does not apply then.
+    """
+    if mirrors is not None:
+        return mirrors.fetch_branch(repo_url, branch, path, callbacks)
+    import pygit2
+    repo = pygit2.init_repository(path, bare=True)
+    remote = repo.remotes.create("origin", repo_url, f"+refs/heads/{branch}:refs/remotes/origin/{branch}")
+    remote.fetch(callbacks=callbacks, depth=depth)
+    return repo
+
+
+def mirror_cache(config: Dict[str, Any]) -> MirrorCache | None:
+    """Returns the mirror cache configured by "mirror_cache_dir", None if it is disabled."""
+    if not config.get("mirror_cache_dir"):
+        return None
+    from .mirrors import MirrorCache
+    return MirrorCache(config["mirror_cache_dir"], config.get("mirror_cache_max_bytes", 2 * 1024 * 1024 * 1024))
+
+
+def find_in_tree(tree: pygit2.Tree, pattern: str) -> list[str]:
+    """
+    Returns the paths in a git tree that match `pattern`, e.g. ".github/workflows/*.y*ml".
+    Every path component may be a glob; it only matches names within its own directory.
+    """
+    import pygit2
+    matches = []
+
+    def walk(tree: pygit2.Tree, parts: list[str], prefix: str):
+        head, rest = parts[0], parts[1:]
+        if any(c in head for c in "*?["):
+            entries = [entry for entry in tree if fnmatch.fnmatchcase(entry.name, head)]
+        else:
+            entries = [tree[head]] if head in tree else []
+        for entry in entries:
+            if not rest:
+                matches.append(prefix + entry.name)
+            elif isinstance(entry, pygit2.Tree):
+                walk(entry, rest, f"{prefix}{entry.name}/")
+
+    walk(tree, pattern.strip("/").split("/"), "")
+    return matches
+
+
+# Seconds an idle SSH master connection stays up; pushes of a run are minutes apart.
+SSH_CONTROL_PERSIST = 600
+
+
+def _ssh_destination(url: str) -> str | None:
+    """Returns "user@host" of an SSH remote URL (scp-like or ssh://), None for other URLs."""
+    match = re.match(r"^ssh://([^/]+)/", url) or re.match(r"^([\w.-]+@[\w.-]+):", url)
+    return match.group(1) if match else None
+
+
+class GitRemote:
+    """
+    The run's handle to "origin" of a local repository.
+
+    One fetch asks for several branches and one push sends several refs, each over a
+    single connection and ref advertisement. All fetches go into the same repository,
+    so later ones only negotiate the commits that are new.
+
+    libgit2 cannot keep a transport connection open between operations. So with a
+    `control_dir`, pushes to an SSH remote go through the git CLI with an OpenSSH
+    ControlMaster: the first push opens an authenticated master connection with a socket
+    in `control_dir`, later pushes of the run (the ci commit, autotest branches,
+    retention deletes) are multiplexed over it. Other remotes push with libgit2.
+    """
+
+    def __init__(self, repo: pygit2.Repository, callbacks: pygit2.RemoteCallbacks, control_dir: str | None = None):
+        self.repo = repo
+        self.callbacks = callbacks
+        self.remote = repo.remotes["origin"]
+        self.destination = _ssh_destination(self.remote.url) if control_dir and shutil.which("git") else None
+        self.control_path = os.path.join(control_dir, "ssh-control") if self.destination else None
+        if self.destination:
+            atexit.register(self.close)
+
+    def _ssh_command(self) -> str:
+        return (f"ssh -o ControlMaster=auto -o ControlPersist={SSH_CONTROL_PERSIST} "
+                f"-o ControlPath={self.control_path}")
+
+    def fetch(self, branches: list[str], depth: int = 0):
+        refspecs = [f"+refs/heads/{branch}:refs/remotes/origin/{branch}" for branch in branches]
+        self.remote.fetch(refspecs, callbacks=self.callbacks, depth=depth)
+
+    def tip(self, branch: str) -> pygit2.Oid:
+        return self.repo.references[f"refs/remotes/origin/{branch}"].target
+
+    def push(self, refs: list[str]):
+        if self.destination is None:
+            self.remote.push(refs, callbacks=self.callbacks)
+            return
+        import pygit2
+        result = subprocess.run(["git", f"--git-dir={self.repo.path}", "push", "origin", *refs],
+                                env=dict(os.environ, GIT_SSH_COMMAND=self._ssh_command()),
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise pygit2.GitError(f"git push failed: {result.stderr.strip()}")
+
+    def close(self):
+        """Stops the SSH master connection, if one was opened."""
+        if self.control_path and os.path.exists(self.control_path):
+            subprocess.run(["ssh", "-o", f"ControlPath={self.control_path}", "-O", "exit", self.destination],
+                           capture_output=True)
+
 
 class CICommit:
     def __init__(self, repo_ssh_url: str, branch: str, config: Dict[str, Any]):
+        import pygit2
         assert repo_ssh_url.startswith("git") is True
         self.repo_ssh_url = repo_ssh_url
         self.branch = branch
@@ -15,37 +142,107 @@ class CICommit:
         self.callbacks = pygit2.RemoteCallbacks(
             credentials=pygit2.KeypairFromAgent("git")
         )
-        self.repo = pygit2.clone_repository(self.repo_ssh_url, self.tmpdir.name, callbacks=self.callbacks, checkout_branch=self.branch)
         self.branch_ref = f"refs/heads/{self.branch}"
-        self.repo.checkout(self.branch_ref)
+        self.repo = self._fetch_branch()
+        # Holds the socket of the SSH master connection the run's pushes share.
+        self.control_dir = tempfile.TemporaryDirectory(prefix="ssh-")
+        self.origin = GitRemote(self.repo, self.callbacks, self.control_dir.name)
+        self.parent_sha = self.origin.tip(self.branch)
         author = pygit2.Signature(self.config["sa_login"], self.config["sa_mail"])
         committer = pygit2.Signature(self.config["sa_login"], self.config["sa_mail"])
-        tree = self.repo.index.write_tree()
-        parent = self.repo.head.target
+        parent = self.repo[self.parent_sha]
         commit_message = "ci"
+        # The "ci" commit reuses the parent's tree, so nothing has to be checked out.
         self.commit_sha = self.repo.create_commit(
             self.branch_ref,
             author,
             committer,
             commit_message,
-            tree,
-            [parent]
+            parent.tree_id,
+            [parent.id]
         )
 
+    def _fetch_branch(self) -> pygit2.Repository:
+        return fetch_branch(self.repo_ssh_url, self.branch, self.tmpdir.name, self.callbacks,
+                            self.config.get("clone_depth", 1), mirror_cache(self.config))
+
     def push(self):
-        remote = self.repo.remotes["origin"]
-        remote.push([self.branch_ref], callbacks=self.callbacks)
+        self.origin.push([self.branch_ref])
 
-    def push_to_autotest_branch(self):
+    def autotest_ref(self) -> str:
+        """Creates a local autotest branch pointing to the "ci" commit and returns its ref."""
         shortdate = time.strftime("%Y%m%d%H%M")
         target_branch_name = f"{self.branch}_autotests{shortdate}"
         target_branch_ref = f"refs/heads/{target_branch_name}"
 
         # Create a new reference (branch) in the local repository pointing to the current commit
         self.repo.references.create(target_branch_ref, self.commit_sha, force=True)
+        return target_branch_ref
+
+    def push_to_autotest_branch(self):
+        self.origin.push([self.autotest_ref()])
+
+    def push_refs(self, refs: list[str]):
+        """Pushes several local refs (e.g. [self.branch_ref, self.autotest_ref()]) in one go."""
+        self.origin.push(refs)
+
+
+class GitDataCICommit:
+    """
+    Same interface as CICommit, but the "ci" commit is created with the Git Data API:
+    the branch tip and its tree are read, a commit on top of it is created and refs are
+    created or moved. Nothing is cloned and nothing goes over SSH.
+
+    :param repo_name: The repository in "owner/repo" form.
+    :param gh: GithubContext the API requests are sent through.
+    """
 
-        remote = self.repo.remotes["origin"]
-        remote.push([target_branch_ref], callbacks=self.callbacks)
+    def __init__(self, repo_name: str, branch: str, config: Dict[str, Any], gh):
+        from github import InputGitAuthor
+        self.branch = branch
+        self.config = config
+        self.branch_ref = f"refs/heads/{self.branch}"
+        self.repo = gh.get_repo(repo_name)
+        self._branch_git_ref = self.repo.get_git_ref(f"heads/{self.branch}")
+        self.parent_sha = self._branch_git_ref.object.sha
+        parent = self.repo.get_git_commit(self.parent_sha)
+        author = InputGitAuthor(self.config["sa_login"], self.config["sa_mail"])
+        commit = self.repo.create_git_commit("ci", parent.tree, [parent], author=author, committer=author)
+        self.commit_sha = commit.sha
+
+    def push(self):
+        self._branch_git_ref.edit(self.commit_sha)
+
+    def push_to_autotest_branch(self):
+        from github import GithubException
+        shortdate = time.strftime("%Y%m%d%H%M")
+        target_branch_name = f"{self.branch}_autotests{shortdate}"
+        try:
+            self.repo.create_git_ref(f"refs/heads/{target_branch_name}", self.commit_sha)
+        except GithubException as e:
+            if e.status != 422:
+                raise
+            # The branch already exists (second run within a minute), move it like a forced push.
+            ref = self.repo.get_git_ref(f"heads/{target_branch_name}")
+            ref.object  # the lazy ref only learns its API url once fetched
+            ref.edit(self.commit_sha, force=True)
+
+
+def make_ci_commit(backend: str, repo_url: str, branch: str, config: Dict[str, Any], gh=None):
+    """
+    Creates the "ci" commit with the given backend: "git" (CICommit, fetch and push over SSH)
+    or "api" (GitDataCICommit, requires `gh`).
+    """
+    if backend == "git":
+        return CICommit(repo_url, branch, config)
+    if backend == "api":
+        if gh is None:
+            raise ValueError("The api commit backend needs a GitHub token")
+        match = re.search(r'git@github.com:(.*)\.git', repo_url)
+        if not match:
+            raise ValueError(f"Could not extract repository name from {repo_url}")
+        return GitDataCICommit(match.group(1), branch, config, gh)
+    raise ValueError(f"Unknown commit backend: {backend}")
 
 
 def get_first_n_lines(text: str, n: int) -> str:
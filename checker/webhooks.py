@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUPPORTED_EVENTS = ("workflow_run", "check_suite")
+
+_active_receiver = None
+
+
+class WorkflowEventReceiver:
+    """
+    A small embedded HTTP server that accepts GitHub `workflow_run` and `check_suite`
+    webhook deliveries and wakes up threads waiting for a run to complete.
+
+    Runs are matched by workflow run id, check suites by check suite id
+    (every workflow run belongs to exactly one check suite).
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 0, secret: str | None = None):
+        self.secret = secret
+        self._condition = threading.Condition()
+        self._seen = set()
+        self._completed = {}
+        self._consumed = set()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"Listening for workflow webhook events on port {self.port}")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def has_events_for(self, run_id: int, check_suite_id: int | None = None) -> bool:
+        with self._condition:
+            return ("run", run_id) in self._seen or ("suite", check_suite_id) in self._seen
+
+    def wait_for_completion(self, run_id: int, check_suite_id: int | None = None, timeout: float | None = None) -> dict | None:
+        """
+        Blocks until a completion event for the run (or its check suite) arrives.
+        The event is consumed: it wakes up a single wait, see `completion_consumed`.
+
+        :return: The `workflow_run` or `check_suite` object of the completion payload, or None on timeout.
+        """
+        keys = [("run", run_id), ("suite", check_suite_id)]
+        with self._condition:
+            self._condition.wait_for(lambda: any(key in self._completed for key in keys), timeout=timeout)
+            completed = [self._completed.pop(key) for key in keys if key in self._completed]
+            if completed:
+                self._consumed.update(keys)
+                return completed[0]
+        return None
+
+    def completion_consumed(self, run_id: int, check_suite_id: int | None = None) -> bool:
+        """Whether a completion event for the run (or its check suite) already woke up a wait."""
+        with self._condition:
+            return ("run", run_id) in self._consumed or ("suite", check_suite_id) in self._consumed
+
+    def _verify_signature(self, body: bytes, signature: str | None) -> bool:
+        if not self.secret:
+            return True
+        if not signature:
+            return False
+        expected = "sha256=" + hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    def _record(self, event: str, payload: dict):
+        obj = payload.get(event) or {}
+        key = ("run", obj.get("id")) if event == "workflow_run" else ("suite", obj.get("id"))
+        with self._condition:
+            self._seen.add(key)
+            if payload.get("action") == "completed" or obj.get("status") == "completed":
+                self._completed[key] = obj
+            self._condition.notify_all()
+
+    def _make_handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not receiver._verify_signature(body, self.headers.get("X-Hub-Signature-256")):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+
+                event = self.headers.get("X-GitHub-Event")
+                if event in SUPPORTED_EVENTS:
+                    try:
+                        receiver._record(event, json.loads(body))
+                    except ValueError:
+                        self.send_response(400)
+                        self.end_headers()
+                        return
+
+                self.send_response(202)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def start_receiver(port: int, secret: str | None = None) -> WorkflowEventReceiver:
+    """Starts the receiver and makes it the one used by workflow checks."""
+    global _active_receiver
+    receiver = WorkflowEventReceiver(port=port, secret=secret)
+    receiver.start()
+    _active_receiver = receiver
+    return receiver
+
+
+def stop_receiver():
+    global _active_receiver
+    if _active_receiver:
+        _active_receiver.stop()
+        _active_receiver = None
+
+
+def active_receiver() -> WorkflowEventReceiver | None:
+    return _active_receiver
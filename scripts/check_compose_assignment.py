@@ -1,12 +1,14 @@
 import argparse
-import importlib
 import re
 import sys
 from functools import partial
 
 from checker.checks import CONFIG, check_release_updates_data, push_and_check_workflow, check_tests_passed, \
-    check_docker_image_exists, check_deploy_ref_matches_commit
-from checker.utils import CICommit
+    check_docker_image_exists, check_image_size_budget, check_deploy_ref_matches_commit, collect_stale_refs
+from checker import app_client
+from checker.apps import load_app
+from checker.utils import make_ci_commit
+from checker.webhooks import start_receiver
 
 
 def main():
@@ -31,8 +33,26 @@ def main():
                         help="Timeout for checks")
     parser.add_argument("--poll_interval", type=int, required=True,
                         help="Poll interval for checks")
+    parser.add_argument("--poll_strategy", type=str, default=CONFIG["poll_strategy"], choices=["fixed", "backoff"],
+                        help="How the delay between polls evolves: fixed or backoff")
     parser.add_argument("--branch_name", type=str, required=True,
                         help="Branch name for CI commit")
+    parser.add_argument("--commit_backend", type=str, default="git", choices=["git", "api"],
+                        help="How the CI commit is created: git (fetch and push over SSH) or api (Git Data API)")
+    parser.add_argument("--mirror_cache_dir", type=str, default=None,
+                        help="Keep persistent git mirrors here so fetches are incremental (self-hosted runners)")
+    parser.add_argument("--retention_keep_last", type=int, default=CONFIG["retention_keep_last"],
+                        help="Number of newest autotest branches and ci-* tags/releases kept after a successful run")
+    parser.add_argument("--retention_max_age_days", type=int, default=CONFIG["retention_max_age_days"],
+                        help="Autotest branches and ci-* tags/releases younger than this are kept")
+    parser.add_argument("--retention_dry_run", action="store_true",
+                        help="Only list the branches, tags and releases retention would delete")
+    parser.add_argument("--image_measure_uncompressed", action="store_true",
+                        help="Also measure uncompressed image size (downloads every layer) and check its budget")
+    parser.add_argument("--webhook_port", type=int, default=None,
+                        help="Port to receive workflow_run/check_suite webhooks on instead of polling GitHub")
+    parser.add_argument("--webhook_secret", type=str, default=None,
+                        help="Secret used to verify webhook signatures")
 
     args = parser.parse_args()
 
@@ -42,29 +62,40 @@ def main():
     CONFIG["sa_mail"] = args.sa_mail
     CONFIG["timeout"] = args.timeout
     CONFIG["poll_interval"] = args.poll_interval
+    CONFIG["poll_strategy"] = args.poll_strategy
+    CONFIG["retention_keep_last"] = args.retention_keep_last
+    CONFIG["retention_max_age_days"] = args.retention_max_age_days
+    CONFIG["retention_dry_run"] = args.retention_dry_run
+    CONFIG["image_measure_uncompressed"] = args.image_measure_uncompressed
+    CONFIG["mirror_cache_dir"] = args.mirror_cache_dir
+
+    if args.webhook_port:
+        start_receiver(args.webhook_port, args.webhook_secret)
 
     print(f"Checking assignment for repository: {args.repo_url}")
 
     try:
-        snake_case_app_name = args.app.replace('-', '_')
-        app_api = importlib.import_module(f"checker.apps.{snake_case_app_name}")
+        app_api = load_app(args.app)
     except ImportError:
         print(f"Could not import app API for {args.app}")
         sys.exit(1)
 
     app_url = f"http://app.{args.id}.{args.proxy}"
-    ci_commit = CICommit(args.repo_url, args.branch_name, CONFIG)
     match = re.search(r'git@github.com:(.*)\.git', args.repo_url)
     if not match:
         print("Could not extract repository name from repo_url.")
         sys.exit(1)
     repo_name = match.group(1)
+    from checker.github_client import GithubContext
+    gh = GithubContext(args.github_token, CONFIG["http_cache_dir"], CONFIG["rate_limit_state"])
+    ci_commit = make_ci_commit(args.commit_backend, args.repo_url, args.branch_name, CONFIG, gh)
 
     tests = []
-    tests.append(partial(push_and_check_workflow, ci_commit, repo_name, str(ci_commit.commit_sha), args.github_token))
-    tests.append(partial(check_tests_passed, repo_name, str(ci_commit.commit_sha), args.github_token))
-    tests.append(partial(check_docker_image_exists, image_name, str(ci_commit.commit_sha), args.github_token))
-    tests.append(partial(check_release_updates_data, app_api, app_url, repo_name, args.github_token, str(ci_commit.commit_sha)))
+    tests.append(partial(push_and_check_workflow, ci_commit, repo_name, str(ci_commit.commit_sha), gh))
+    tests.append(partial(check_tests_passed, repo_name, str(ci_commit.commit_sha), gh))
+    tests.append(partial(check_docker_image_exists, image_name, str(ci_commit.commit_sha), gh))
+    tests.append(partial(check_image_size_budget, image_name, str(ci_commit.commit_sha), gh, str(ci_commit.parent_sha)))
+    tests.append(partial(check_release_updates_data, app_api, app_url, repo_name, gh, str(ci_commit.commit_sha)))
     tests.append(partial(check_deploy_ref_matches_commit, app_api, app_url, str(ci_commit.commit_sha)))
 
     failed_tests = 0
@@ -80,11 +111,14 @@ def main():
             print(f"[{test.func.__name__}] Test failed with exception:\n{str(e)}")
             failed_tests += 1
 
+    print(app_client.timing_summary())
+
     if failed_tests != 0:
         print(f"\n{failed_tests} out of {len(tests)} checks FAILED.")
         sys.exit(1)
     else:
         print("\nAll test PASSED.")
+        collect_stale_refs(gh, repo_name, args.branch_name, ci_commit)
         sys.exit(0)
 
 if __name__ == "__main__":
@@ -1,10 +1,12 @@
 import argparse
+import re
 import sys
-import importlib
 from functools import partial
 
-from checker.checks import check_app_is_alive, check_event_update_site, CONFIG, check_deploy_ref_matches_commit
-from checker.utils import CICommit
+from checker.checks import check_app_is_alive, check_event_update_site, CONFIG, check_deploy_ref_matches_commit, collect_stale_refs
+from checker import app_client
+from checker.apps import load_app
+from checker.utils import make_ci_commit
 
 
 def main():
@@ -21,12 +23,26 @@ def main():
                         help="GitHub service account login")
     parser.add_argument("--sa_mail", type=str, required=True,
                         help="GitHub service account login")
+    parser.add_argument("--github_token", type=str, default=None,
+                        help="GitHub token, only needed for the api commit backend.")
     parser.add_argument("--timeout", type=int, required=True,
                         help="Timeout for checks")
     parser.add_argument("--poll_interval", type=int, required=True,
                         help="Poll interval for checks")
+    parser.add_argument("--poll_strategy", type=str, default=CONFIG["poll_strategy"], choices=["fixed", "backoff"],
+                        help="How the delay between polls evolves: fixed or backoff")
     parser.add_argument("--branch_name", type=str, required=True,
                         help="Branch name for CI commit")
+    parser.add_argument("--commit_backend", type=str, default="git", choices=["git", "api"],
+                        help="How the CI commit is created: git (fetch and push over SSH) or api (Git Data API)")
+    parser.add_argument("--mirror_cache_dir", type=str, default=None,
+                        help="Keep persistent git mirrors here so fetches are incremental (self-hosted runners)")
+    parser.add_argument("--retention_keep_last", type=int, default=CONFIG["retention_keep_last"],
+                        help="Number of newest autotest branches and ci-* tags/releases kept after a successful run")
+    parser.add_argument("--retention_max_age_days", type=int, default=CONFIG["retention_max_age_days"],
+                        help="Autotest branches and ci-* tags/releases younger than this are kept")
+    parser.add_argument("--retention_dry_run", action="store_true",
+                        help="Only list the branches, tags and releases retention would delete")
 
     args = parser.parse_args()
 
@@ -34,12 +50,16 @@ def main():
     CONFIG["sa_mail"] = args.sa_mail
     CONFIG["timeout"] = args.timeout
     CONFIG["poll_interval"] = args.poll_interval
+    CONFIG["poll_strategy"] = args.poll_strategy
+    CONFIG["retention_keep_last"] = args.retention_keep_last
+    CONFIG["retention_max_age_days"] = args.retention_max_age_days
+    CONFIG["retention_dry_run"] = args.retention_dry_run
+    CONFIG["mirror_cache_dir"] = args.mirror_cache_dir
 
     print(f"Checking assignment for repository: {args.repo_url}")
 
     try:
-        snake_case_app_name = args.app.replace('-', '_')
-        app_api = importlib.import_module(f"checker.apps.{snake_case_app_name}")
+        app_api = load_app(args.app)
     except ImportError:
         print(f"Could not import app API for {args.app}")
         sys.exit(1)
@@ -49,7 +69,12 @@ def main():
     app_url = f"http://app.{args.id}.{args.proxy}"
     tests.append(partial(check_app_is_alive, app_api, app_url))
 
-    ci_commit = CICommit(args.repo_url, args.branch_name, CONFIG)
+    gh = None
+    if args.github_token:
+        # PyGithub is only loaded when the GitHub API is used.
+        from checker.github_client import GithubContext
+        gh = GithubContext(args.github_token, CONFIG["http_cache_dir"], CONFIG["rate_limit_state"])
+    ci_commit = make_ci_commit(args.commit_backend, args.repo_url, args.branch_name, CONFIG, gh)
     tests.append(partial(check_event_update_site, app_api, app_url, ci_commit))
     tests.append(partial(check_deploy_ref_matches_commit, app_api, app_url, str(ci_commit.commit_sha)))
 
@@ -67,11 +92,16 @@ def main():
             print(f"[{test.func.__name__}] Test failed with exception:\n{str(e)}")
             failed_tests += 1
 
+    print(app_client.timing_summary())
+
     if failed_tests != 0:
         print(f"\n{failed_tests} out of {len(tests)} checks FAILED.")
         sys.exit(1)
     else:
         print("\nAll test PASSED.")
+        match = re.search(r'git@github.com:(.*)\.git', args.repo_url)
+        if gh is not None and match:
+            collect_stale_refs(gh, match.group(1), args.branch_name, ci_commit)
         sys.exit(0)
 
 if __name__ == "__main__":
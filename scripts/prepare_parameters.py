@@ -44,6 +44,8 @@ if __name__ == '__main__':
     out_parameters["sa_mail"] = params["sa_mail"]
     out_parameters["timeout"] = params["timeout"]
     out_parameters["poll_interval"] = params["poll_interval"]
+    out_parameters["poll_strategy"] = params.get("poll_strategy", "backoff")
+    out_parameters["commit_backend"] = params.get("commit_backend", "git")
 
     output_str = "\n".join(f"{k}={str(v).lower()}" for k, v in out_parameters.items())
     print(output_str)
\ No newline at end of file
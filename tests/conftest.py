@@ -0,0 +1,14 @@
+import pytest
+
+from checker.checks import CONFIG
+
+# CONFIG entries that point into the user's cache directory by default.
+CACHE_PATHS = ("http_cache_dir", "rate_limit_state", "artifact_cache_dir", "mirror_cache_dir", "layer_size_cache")
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Keeps the unit tests from writing to ~/.cache/check-assignment."""
+    for key in CACHE_PATHS:
+        if CONFIG.get(key):
+            monkeypatch.setitem(CONFIG, key, str(tmp_path / "cache" / key))
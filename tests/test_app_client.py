@@ -0,0 +1,235 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from checker import app_client
+from checker.apps import load_app
+from checker.extractors import find_meta_content
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+
+    def do_GET(self):
+        KeepAliveHandler.client_ports.add(self.client_address[1])
+        body = b'<html><head><meta name="deployref" content="abc123"></head></html>'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def app_url():
+    KeepAliveHandler.client_ports = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    app_client.close_sessions()
+    server.shutdown()
+    server.server_close()
+
+
+def test_app_requests_share_one_connection(app_url):
+    for _ in range(3):
+        assert load_app("website-example").extract_deploy_ref(app_url) == "abc123"
+    assert load_app("website-example").is_alive(app_url)
+
+    assert len(KeepAliveHandler.client_ports) == 1
+    timings = app_client.request_timings()
+    # HEAD and /version probe for a deploy ref fast path first, the app has none.
+    assert [t.status for t in timings] == [501, 200, 200, 200, 200, 200]
+    assert all(t.elapsed >= 0 for t in timings)
+    assert "6 app requests" in app_client.timing_summary()
+
+
+def test_sessions_are_per_base_url(app_url):
+    assert app_client.session(f"{app_url}/api/posts") is app_client.session(app_url)
+    assert app_client.session("http://other.example") is not app_client.session(app_url)
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves `body`; answers conditional requests when `etag` is set."""
+    protocol_version = "HTTP/1.1"
+    body = b""
+    etag = None
+    not_modified = 0
+
+    def do_GET(self):
+        if PageHandler.etag and self.headers.get("If-None-Match") == PageHandler.etag:
+            PageHandler.not_modified += 1
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        if PageHandler.etag:
+            self.send_header("ETag", PageHandler.etag)
+        self.send_header("Content-Length", str(len(PageHandler.body)))
+        self.end_headers()
+        self.wfile.write(PageHandler.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def page_url():
+    PageHandler.body, PageHandler.etag, PageHandler.not_modified = b"", None, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    app_client.close_sessions()
+    server.shutdown()
+    server.server_close()
+
+
+def _counting_meta_extractor(calls):
+    def extract(response):
+        calls.append(response.url)
+        return find_meta_content(response, "deployref")
+    return extract
+
+
+def test_not_modified_reuses_previous_value(page_url):
+    PageHandler.body = b'<meta name="deployref" content="v1">'
+    PageHandler.etag = '"v1"'
+    calls = []
+
+    assert app_client.fetch_extracted(page_url, _counting_meta_extractor(calls)) == "v1"
+    assert app_client.fetch_extracted(page_url, _counting_meta_extractor(calls)) == "v1"
+
+    assert PageHandler.not_modified == 1
+    assert len(calls) == 1
+
+
+def test_unchanged_body_skips_extraction(page_url):
+    calls = []
+    extract = _counting_meta_extractor(calls)
+    PageHandler.body = b'<head><meta name="deployref" content="v1"></head>' + b"<p>x</p>" * 5000
+
+    assert app_client.fetch_extracted(page_url, extract) == "v1"
+    assert app_client.fetch_extracted(page_url, extract) == "v1"
+    assert len(calls) == 1
+
+    PageHandler.body = PageHandler.body.replace(b"v1", b"v2")
+    assert app_client.fetch_extracted(page_url, extract) == "v2"
+    assert len(calls) == 2
+
+
+def test_longer_body_is_not_mistaken_for_unchanged(page_url):
+    calls = []
+    extract = _counting_meta_extractor(calls)
+    PageHandler.body = b"<html><body>deploying</body></html>"
+
+    assert app_client.fetch_extracted(page_url, extract) is None
+    PageHandler.body += b'<meta name="deployref" content="v2">'
+    assert app_client.fetch_extracted(page_url, extract) == "v2"
+    assert len(calls) == 2
+
+
+def test_shorter_body_is_extracted_from_the_bytes_already_read(page_url):
+    calls = []
+    extract = _counting_meta_extractor(calls)
+    PageHandler.body = b"<html><body>" + b"<p>still deploying</p>" * 1000 + b"</body></html>"
+
+    assert app_client.fetch_extracted(page_url, extract) is None
+    # The new page ends before the previously read prefix, the stream is consumed by the comparison.
+    PageHandler.body = b"<html><body>deploying</body></html>"
+    assert app_client.fetch_extracted(page_url, extract) is None
+    PageHandler.body = b'<meta name="deployref" content="v2">'
+    assert app_client.fetch_extracted(page_url, extract) == "v2"
+    assert len(calls) == 3
+
+
+class FastPathHandler(BaseHTTPRequestHandler):
+    """App that serves its deploy ref in a header, at /version or not at all, depending on `mode`."""
+    protocol_version = "HTTP/1.1"
+    mode = None
+    requests = []
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        FastPathHandler.requests.append(("HEAD", self.path))
+        self._send(200, headers={"X-Deploy-Ref": "from-header"} if self.mode == "header" else {})
+
+    def do_GET(self):
+        FastPathHandler.requests.append(("GET", self.path))
+        if self.path == "/version":
+            if self.mode == "endpoint":
+                return self._send(200, b'{"deploy_ref": "from-endpoint"}')
+            return self._send(404)
+        self._send(200, b'<meta name="deployref" content="from-page">')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fast_path_app():
+    FastPathHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FastPathHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    app_client.close_sessions()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("mode, expected, poll_request", [
+    ("header", "from-header", ("HEAD", "/")),
+    ("endpoint", "from-endpoint", ("GET", "/version")),
+    (None, "from-page", ("GET", "/")),
+])
+def test_fast_path_is_detected_once(fast_path_app, mode, expected, poll_request):
+    FastPathHandler.mode = mode
+
+    assert load_app("website-example").extract_deploy_ref(fast_path_app) == expected
+    FastPathHandler.requests = []
+    assert load_app("website-example").extract_deploy_ref(fast_path_app) == expected
+
+    assert FastPathHandler.requests == [poll_request]
+
+
+def test_fast_path_stays_undecided_while_app_is_starting(requests_mock):
+    app_url = "http://starting.test/"
+    requests_mock.head(app_url, [{"status_code": 503}, {"status_code": 200, "headers": {"X-Deploy-Ref": "abc123"}}])
+
+    assert app_client.fast_deploy_ref(app_url) is None
+    assert app_client.fast_deploy_ref(app_url) == "abc123"
+    app_client.close_sessions()
+
+
+def test_fast_path_is_off_after_client_errors(requests_mock):
+    app_url = "http://private.test/"
+    requests_mock.head(app_url, status_code=401)
+    requests_mock.get(app_url + "version", status_code=403)
+
+    assert app_client.fast_deploy_ref(app_url) is None
+    assert requests_mock.call_count == 2
+    assert app_client.fast_deploy_ref(app_url) is None
+    assert requests_mock.call_count == 2
+    app_client.close_sessions()
+
+
+def test_fast_path_probes_are_capped_while_app_fails(requests_mock):
+    app_url = "http://failing.test/"
+    requests_mock.head(app_url, status_code=502)
+
+    for _ in range(app_client.MAX_FAST_PATH_PROBES + 2):
+        assert app_client.fast_deploy_ref(app_url) is None
+    assert requests_mock.call_count == app_client.MAX_FAST_PATH_PROBES
+    app_client.close_sessions()
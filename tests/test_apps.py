@@ -0,0 +1,66 @@
+import pytest
+
+from checker import app_client
+from checker.apps import csharp_example, load_app
+from checker.apps._descriptor import DescribedApp
+
+
+@pytest.fixture(autouse=True)
+def fresh_app_client():
+    yield
+    app_client.close_sessions()
+
+
+def test_load_app_compiles_descriptor_once():
+    app = load_app("website-example")
+    assert isinstance(app, DescribedApp)
+    assert load_app("website-example") is app
+    assert isinstance(load_app("check-assignment-tests"), DescribedApp)
+
+
+def test_load_app_falls_back_to_module():
+    assert load_app("csharp-example") is csharp_example
+    with pytest.raises(ImportError):
+        load_app("no-such-app")
+
+
+def test_descriptor_data_round_trip(requests_mock):
+    app = load_app("website-example")
+    requests_mock.get("http://app.test/api/posts", json=[{"name": "a"}])
+    post = requests_mock.post("http://app.test/api/post", status_code=201)
+
+    assert app.get_data("http://app.test") == [{"name": "a"}]
+    data = app.generate_random_data("http://app.test")
+    assert data == post.last_request.json()
+    assert data["name"].startswith("Stub name with id: ")
+    assert data["name"][len("Stub name with id: "):] in data["message"]
+
+    requests_mock.get("http://app.test/api/posts", status_code=500)
+    assert app.get_data("http://app.test") == {}
+
+
+def test_descriptor_openapi_deploy_ref_with_basic_auth(requests_mock):
+    app = DescribedApp("described", {
+        "data": {"path": "/api/items"},
+        "create": {"path": "/api/items", "json": {"id": "{uuid}"}, "returns": "response"},
+        "auth": {"type": "basic", "username": "admin", "password": "secret"},
+        "deploy_ref": {"source": "openapi", "path": "/swagger.json", "pattern": r"Deploy Ref: ([^)]+)"},
+    })
+    requests_mock.head("http://app.test/", status_code=404)
+    requests_mock.get("http://app.test/version", status_code=404)
+    swagger = requests_mock.get("http://app.test/swagger.json", json={
+        "openapi": "3.0.1", "info": {"title": "Api", "version": "v1", "description": "(Deploy Ref: abc123)"}})
+    requests_mock.post("http://app.test/api/items", json={"id": 1})
+
+    assert app.extract_deploy_ref("http://app.test/") == "abc123"
+    assert swagger.last_request.headers["Authorization"].startswith("Basic ")
+    assert app.generate_random_data("http://app.test") == {"id": 1}
+
+    requests_mock.get("http://app.test/swagger.json", status_code=503)
+    with pytest.raises(ValueError):
+        app.extract_deploy_ref("http://app.test/")
+
+
+def test_descriptor_rejects_unknown_deploy_ref_source():
+    with pytest.raises(ValueError):
+        DescribedApp("broken", {"data": {}, "create": {}, "deploy_ref": {"source": "xpath"}})
@@ -0,0 +1,140 @@
+import contextlib
+import hashlib
+import io
+import os
+import zipfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from checker import artifacts
+from checker.artifacts import ArtifactCache, download_artifact, open_artifact_zip, summarize_artifact, \
+    summarize_artifacts
+
+
+def make_zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+
+def mock_download(chunks, headers=None):
+    response = MagicMock()
+    response.headers = headers or {}
+    response.iter_content.return_value = chunks
+    return response
+
+
+@patch('requests.get')
+def test_download_streams_into_spool(mock_requests_get):
+    data = make_zip({"report.xml": "<testsuite/>"})
+    mock_requests_get.return_value = mock_download([data[:10], data[10:]])
+
+    spool, size = download_artifact("http://fake-url.com", "token", max_bytes=1024 * 1024)
+
+    assert size == len(data)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(spool)
+        assert open_artifact_zip(stack, spool, size).read("report.xml") == b"<testsuite/>"
+    assert mock_requests_get.call_args.kwargs["stream"] is True
+
+
+@patch('requests.get')
+def test_download_rejects_declared_oversized_artifact(mock_requests_get):
+    response = mock_download([b"x"], headers={"Content-Length": "2048"})
+    mock_requests_get.return_value = response
+
+    with pytest.raises(ValueError):
+        download_artifact("http://fake-url.com", "token", max_bytes=1024)
+    response.iter_content.assert_not_called()
+
+
+@patch('requests.get')
+def test_download_aborts_when_stream_exceeds_limit(mock_requests_get):
+    mock_requests_get.return_value = mock_download([b"x" * 600, b"x" * 600])
+
+    with pytest.raises(ValueError):
+        download_artifact("http://fake-url.com", "token", max_bytes=1024)
+
+
+@patch('requests.get')
+def test_large_artifact_is_memory_mapped_from_disk(mock_requests_get, monkeypatch):
+    monkeypatch.setattr(artifacts, "SPOOL_MEMORY_LIMIT", 16)
+    data = make_zip({"report.xml": "<testsuite/>" * 10})
+    mock_requests_get.return_value = mock_download([data])
+
+    spool, size = download_artifact("http://fake-url.com", "token", max_bytes=1024 * 1024)
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(spool)
+        z = open_artifact_zip(stack, spool, size)
+        assert z.read("report.xml") == b"<testsuite/>" * 10
+
+
+@patch('requests.get')
+def test_matrix_artifacts_are_merged(mock_requests_get):
+    downloads = {
+        "http://fake-url.com/linux": make_zip({"junit.xml": '<testsuite tests="3" failures="0" errors="0"/>'}),
+        "http://fake-url.com/dotnet": make_zip({"tests.trx": '<TestRun><ResultSummary><Counters total="2" executed="2" failed="1"/></ResultSummary></TestRun>'}),
+    }
+    mock_requests_get.side_effect = lambda url, **kwargs: mock_download([downloads[url]])
+
+    linux = MagicMock(archive_download_url="http://fake-url.com/linux")
+    linux.name = "test_result-linux"
+    dotnet = MagicMock(archive_download_url="http://fake-url.com/dotnet")
+    dotnet.name = "test_result-dotnet"
+
+    summary = summarize_artifacts([linux, dotnet], "token", max_bytes=1024 * 1024, workers=2)
+
+    assert (summary.tests, summary.failures, summary.reports) == (5, 1, 2)
+    assert summary.passed is False
+
+
+def cacheable_artifact(data: bytes, artifact_id: int = 42) -> MagicMock:
+    artifact = MagicMock(id=artifact_id, archive_download_url="http://fake-url.com")
+    artifact.name = "test_result"
+    artifact.digest = "sha256:" + hashlib.sha256(data).hexdigest()
+    return artifact
+
+
+@patch('requests.get')
+def test_rerun_uses_cached_summary(mock_requests_get, tmp_path):
+    data = make_zip({"junit.xml": '<testsuite tests="3" failures="0" errors="0"/>'})
+    mock_requests_get.return_value = mock_download([data])
+    cache = ArtifactCache(str(tmp_path), max_bytes=1024 * 1024)
+
+    first = summarize_artifact(cacheable_artifact(data), "token", 1024 * 1024, cache)
+    second = summarize_artifact(cacheable_artifact(data), "token", 1024 * 1024, cache)
+
+    assert first == second
+    assert second.tests == 3
+    mock_requests_get.assert_called_once()
+    with open(tmp_path / f"42-sha256-{hashlib.sha256(data).hexdigest()}" / "artifact.zip", "rb") as f:
+        assert f.read() == data
+
+
+@patch('requests.get')
+def test_artifact_with_wrong_digest_is_not_cached(mock_requests_get, tmp_path):
+    data = make_zip({"junit.xml": '<testsuite tests="3" failures="0" errors="0"/>'})
+    mock_requests_get.return_value = mock_download([data])
+    cache = ArtifactCache(str(tmp_path), max_bytes=1024 * 1024)
+    artifact = cacheable_artifact(data)
+    artifact.digest = "sha256:" + "0" * 64
+
+    summarize_artifact(artifact, "token", 1024 * 1024, cache)
+
+    assert os.listdir(tmp_path) == []
+
+
+@patch('requests.get')
+def test_least_recently_used_entries_are_evicted(mock_requests_get, tmp_path):
+    data = make_zip({"junit.xml": '<testsuite tests="3" failures="0" errors="0"/>'})
+    mock_requests_get.return_value = mock_download([data])
+    cache = ArtifactCache(str(tmp_path), max_bytes=len(data) * 2 + 200)
+
+    for artifact_id in (1, 2, 3):
+        summarize_artifact(cacheable_artifact(data, artifact_id), "token", 1024 * 1024, cache)
+
+    assert sorted(name.split("-")[0] for name in os.listdir(tmp_path)) == ["2", "3"]
@@ -30,7 +30,7 @@ def test_event_update_site(requests_mock, monkeypatch):
 
 
 
-    with patch('checker.checks.CICommit') as mock_commit_class:
+    with patch('checker.utils.CICommit') as mock_commit_class:
 
         # The __init__ of Commit is now mocked, so it won't run the git clone.
 
@@ -75,7 +75,7 @@ def test_event_doest_not_update_site(requests_mock, monkeypatch):
 
 
 
-    with patch('checker.checks.CICommit') as mock_commit_class:
+    with patch('checker.utils.CICommit') as mock_commit_class:
 
         mock_commit_instance = mock_commit_class.return_value
 
@@ -1,16 +1,18 @@
 import io
 import zipfile
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from unittest.mock import patch, MagicMock
 from checker.checks import check_workflow_run_success, CONFIG, check_tests_passed, check_event_update_site, \
-    check_deploy_ref_matches_commit
+    check_deploy_ref_matches_commit, _get_workflow_run, _release_run_finder
+from checker.github_client import GithubContext
 
 
 def test_check_workflow_run_success_success(monkeypatch):
     monkeypatch.setitem(CONFIG, "timeout", 1)
     monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         # Mock the Github API response
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
@@ -28,12 +30,12 @@ def test_check_workflow_run_success_success(monkeypatch):
         mock_github_instance.get_repo.return_value = mock_repo
 
         # Call the function and assert the result
-        assert check_workflow_run_success("owner/repo", "commit_sha", "fake_token") is True
+        assert check_workflow_run_success("owner/repo", "commit_sha", GithubContext("fake_token")) is True
 
 def test_check_workflow_run_success_failure(monkeypatch):
     monkeypatch.setitem(CONFIG, "timeout", 1)
     monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         # Mock the Github API response
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
@@ -51,10 +53,10 @@ def test_check_workflow_run_success_failure(monkeypatch):
         mock_github_instance.get_repo.return_value = mock_repo
 
         # Call the function and assert the result
-        assert check_workflow_run_success("owner/repo", "commit_sha", "fake_token") is False
+        assert check_workflow_run_success("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 def test_check_workflow_run_not_found(monkeypatch):
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
 
         # Mock the Github API response
@@ -68,10 +70,22 @@ def test_check_workflow_run_not_found(monkeypatch):
         mock_github_instance.get_repo.return_value = mock_repo
 
         # Call the function and assert the result
-        assert check_workflow_run_success("owner/repo", "commit_sha", "fake_token") is False
+        assert check_workflow_run_success("owner/repo", "commit_sha", GithubContext("fake_token")) is False
+
+
+def test_workflow_run_discovery_uses_poll_strategy(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("checker.checks.sleep", sleeps.append)
+    monkeypatch.setattr("checker.checks._poll_delays", lambda poll_interval: iter([1, 2, 4, 8]))
+    run = MagicMock(status="completed", conclusion="success")
+    find_run = MagicMock(side_effect=[None, None, run])
+
+    assert _get_workflow_run(MagicMock(), find_run) is run
+    assert sleeps == [1, 2]
+
 
 def test_check_workflow_run_timeout(monkeypatch):
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
 
         monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
         monkeypatch.setitem(CONFIG, "timeout", 0.5)
@@ -91,7 +105,7 @@ def test_check_workflow_run_timeout(monkeypatch):
         mock_github_instance.get_repo.return_value = mock_repo
 
         # Call the function and assert the result
-        assert check_workflow_run_success("owner/repo", "commit_sha", "fake_token") is False
+        assert check_workflow_run_success("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 def create_zip_file(xml_content):
     zip_buffer = io.BytesIO()
@@ -109,10 +123,11 @@ def test_check_tests_passed_success(mock_requests_get, monkeypatch):
     xml_content = '<testsuite errors="0" failures="0" skipped="0" tests="12"></testsuite>'
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.content = create_zip_file(xml_content)
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = [create_zip_file(xml_content)]
     mock_requests_get.return_value = mock_response
 
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
         mock_workflow_run.status = "completed"
@@ -134,7 +149,7 @@ def test_check_tests_passed_success(mock_requests_get, monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is True
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is True
 
 
 @patch('requests.get')
@@ -145,10 +160,11 @@ def test_check_tests_passed_test_failures(mock_requests_get, monkeypatch):
     xml_content = '<testsuite errors="0" failures="1" skipped="0" tests="12"></testsuite>'
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.content = create_zip_file(xml_content)
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = [create_zip_file(xml_content)]
     mock_requests_get.return_value = mock_response
 
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
         mock_workflow_run.status = "completed"
@@ -170,7 +186,7 @@ def test_check_tests_passed_test_failures(mock_requests_get, monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 
 @patch('requests.get')
@@ -181,10 +197,11 @@ def test_check_tests_passed_test_errors(mock_requests_get, monkeypatch):
     xml_content = '<testsuite errors="1" failures="0" skipped="0" tests="12"></testsuite>'
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.content = create_zip_file(xml_content)
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = [create_zip_file(xml_content)]
     mock_requests_get.return_value = mock_response
 
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
         mock_workflow_run.status = "completed"
@@ -206,7 +223,7 @@ def test_check_tests_passed_test_errors(mock_requests_get, monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 
 @patch('requests.get')
@@ -217,10 +234,11 @@ def test_check_tests_passed_no_tests(mock_requests_get, monkeypatch):
     xml_content = '<testsuite errors="0" failures="0" skipped="0" tests="0"></testsuite>'
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.content = create_zip_file(xml_content)
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = [create_zip_file(xml_content)]
     mock_requests_get.return_value = mock_response
 
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
         mock_workflow_run.status = "completed"
@@ -242,7 +260,7 @@ def test_check_tests_passed_no_tests(mock_requests_get, monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 
 @patch('requests.get')
@@ -253,10 +271,11 @@ def test_check_tests_passed_invalid_xml(mock_requests_get, monkeypatch):
     xml_content = '<testsuite errors="0" failures="0" skipped="0" tests="12">'  # Malformed XML
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.content = create_zip_file(xml_content)
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = [create_zip_file(xml_content)]
     mock_requests_get.return_value = mock_response
 
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
         mock_workflow_run.status = "completed"
@@ -278,13 +297,13 @@ def test_check_tests_passed_invalid_xml(mock_requests_get, monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 
 def test_check_tests_passed_no_artifact(monkeypatch):
     monkeypatch.setitem(CONFIG, "timeout", 1)
     monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
         mock_workflow_run.status = "completed"
@@ -302,13 +321,13 @@ def test_check_tests_passed_no_artifact(monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 
 def test_check_tests_passed_workflow_failure(monkeypatch):
     monkeypatch.setitem(CONFIG, "timeout", 1)
     monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         mock_repo = MagicMock()
         mock_workflow_run = MagicMock()
         mock_workflow_run.status = "completed"
@@ -324,11 +343,11 @@ def test_check_tests_passed_workflow_failure(monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 
 def test_check_tests_passed_workflow_not_found(monkeypatch):
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
 
         mock_repo = MagicMock()
@@ -340,11 +359,11 @@ def test_check_tests_passed_workflow_not_found(monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 
 def test_check_tests_passed_timeout(monkeypatch):
-    with patch('checker.checks.Github') as mock_github:
+    with patch('checker.github_client.Github') as mock_github:
         monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
         monkeypatch.setitem(CONFIG, "timeout", 0.5)
 
@@ -362,7 +381,7 @@ def test_check_tests_passed_timeout(monkeypatch):
         mock_github_instance = mock_github.return_value
         mock_github_instance.get_repo.return_value = mock_repo
 
-        assert check_tests_passed("owner/repo", "commit_sha", "fake_token") is False
+        assert check_tests_passed("owner/repo", "commit_sha", GithubContext("fake_token")) is False
 
 def test_check_event_update_site_succeeds_despite_transient_errors(monkeypatch):
     """
@@ -405,3 +424,56 @@ def test_check_deploy_ref_matches_commit_succeeds_with_retry(monkeypatch):
     result = check_deploy_ref_matches_commit(mock_app_api, "http://example.com", expected_sha)
 
     assert result is True
+
+
+def test_release_run_finder_reads_one_filtered_page():
+    released_at = datetime(2026, 1, 20, 1, 20, tzinfo=timezone.utc)
+    other_run = MagicMock(id=1, head_branch="ci-20260120-011000", created_at=released_at)
+    release_run = MagicMock(id=2, head_branch="ci-20260120-012000", created_at=released_at)
+
+    mock_repo = MagicMock()
+    mock_repo.get_workflow_runs.return_value.get_page.side_effect = [[other_run], [other_run, release_run]]
+
+    find_run = _release_run_finder(mock_repo, "ci-20260120-012000", released_at)
+
+    assert find_run() is None
+    assert find_run() is release_run
+    mock_repo.get_workflow_runs.assert_called_with(
+        event='release', branch="ci-20260120-012000", created=">=2026-01-20T01:19:00Z"
+    )
+    mock_repo.get_workflow_runs.return_value.get_page.assert_called_with(0)
+
+
+def test_release_run_finder_stops_at_runs_older_than_release():
+    released_at = datetime(2026, 1, 20, 1, 20, tzinfo=timezone.utc)
+    old_run = MagicMock(id=1, head_branch="ci-20260120-012000", created_at=released_at - timedelta(hours=1))
+
+    mock_repo = MagicMock()
+    mock_repo.get_workflow_runs.return_value.get_page.return_value = [old_run]
+
+    assert _release_run_finder(mock_repo, "ci-20260120-012000", released_at)() is None
+
+
+def test_check_tests_passed_reuses_run_waited_for_by_workflow_check(monkeypatch):
+    monkeypatch.setitem(CONFIG, "timeout", 1)
+    monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
+    with patch('checker.github_client.Github') as mock_github:
+        mock_repo = MagicMock()
+        mock_workflow_run = MagicMock()
+        mock_workflow_run.status = "completed"
+        mock_workflow_run.conclusion = "success"
+        mock_workflow_run.get_artifacts.return_value = []
+
+        mock_runs_page = MagicMock()
+        mock_runs_page.totalCount = 1
+        mock_runs_page.__getitem__.return_value = mock_workflow_run
+
+        mock_repo.get_workflow_runs.return_value = mock_runs_page
+        mock_github.return_value.get_repo.return_value = mock_repo
+
+        gh = GithubContext("fake_token")
+        assert check_workflow_run_success("owner/repo", "commit_sha", gh) is True
+        assert check_tests_passed("owner/repo", "commit_sha", gh) is False
+
+        mock_repo.get_workflow_runs.assert_called_once_with(head_sha="commit_sha")
+        assert gh.runs.get(("sha", "commit_sha")) is mock_workflow_run
@@ -0,0 +1,170 @@
+import os
+import shutil
+import socket
+import subprocess
+import time
+
+import pygit2
+import pytest
+
+from checker.checks import CONFIG, check_required_workflow_files
+from checker.utils import CICommit, GitRemote, find_in_tree
+
+SIGNATURE = pygit2.Signature("Student", "student@example.com")
+
+
+@pytest.fixture
+def remote_repo(tmp_path, monkeypatch):
+    """
+    A bare repository with a `main` and a `feature` branch. Its directory name starts
+    with "git" because CICommit only accepts SSH-like URLs; libgit2 treats it as a local path.
+    """
+    repo = pygit2.init_repository(str(tmp_path / "git-remote.git"), bare=True)
+    tree_builder = repo.TreeBuilder()
+    workflows = repo.TreeBuilder()
+    workflows.insert("ci.yml", repo.create_blob(b"on: push"), pygit2.enums.FileMode.BLOB)
+    workflows.insert("deploy.yaml", repo.create_blob(b"on: release"), pygit2.enums.FileMode.BLOB)
+    github = repo.TreeBuilder()
+    github.insert("workflows", workflows.write(), pygit2.enums.FileMode.TREE)
+    tree_builder.insert("README.md", repo.create_blob(b"hello"), pygit2.enums.FileMode.BLOB)
+    tree_builder.insert(".github", github.write(), pygit2.enums.FileMode.TREE)
+    first = repo.create_commit("refs/heads/main", SIGNATURE, SIGNATURE, "first", tree_builder.write(), [])
+    second = repo.create_commit("refs/heads/main", SIGNATURE, SIGNATURE, "second", repo[first].tree_id, [first])
+    repo.create_commit("refs/heads/feature", SIGNATURE, SIGNATURE, "feature", repo[first].tree_id, [second])
+    monkeypatch.chdir(tmp_path)
+    return repo
+
+
+def test_ci_commit_is_created_without_checkout(remote_repo):
+    # The local transport cannot fetch shallow, so fetch the whole branch here.
+    ci_commit = CICommit("git-remote.git", "main", {"sa_login": "CI", "sa_mail": "ci@example.com", "clone_depth": 0})
+
+    commit = ci_commit.repo[ci_commit.commit_sha]
+    main = remote_repo.references["refs/heads/main"].target
+    assert ci_commit.repo.is_bare
+    assert ci_commit.parent_sha == main
+    assert commit.parents[0].id == main
+    assert commit.tree_id == remote_repo[main].tree_id
+    assert "refs/remotes/origin/feature" not in list(ci_commit.repo.references)
+
+    ci_commit.push()
+    assert remote_repo.references["refs/heads/main"].target == ci_commit.commit_sha
+
+
+def test_find_in_tree_supports_globs(remote_repo):
+    tree = remote_repo[remote_repo.references["refs/heads/main"].target].tree
+
+    assert find_in_tree(tree, "README.md") == ["README.md"]
+    assert find_in_tree(tree, ".github/workflows/*.y*ml") == [".github/workflows/ci.yml", ".github/workflows/deploy.yaml"]
+    assert find_in_tree(tree, ".github/*/ci.yml") == [".github/workflows/ci.yml"]
+    assert find_in_tree(tree, "README.md/ci.yml") == []
+    assert find_in_tree(tree, ".github/workflows/ci.yaml") == []
+
+
+def test_check_required_workflow_files_uses_ci_commit_tree(remote_repo):
+    ci_commit = CICommit("git-remote.git", "main", {"sa_login": "CI", "sa_mail": "ci@example.com", "clone_depth": 0})
+
+    assert check_required_workflow_files("git-remote.git", "main", [".github/workflows/deploy.y*ml"], ci_commit)
+    assert not check_required_workflow_files("git-remote.git", "main", [".github/workflows/test.y*ml"], ci_commit)
+
+
+def test_check_required_workflow_files_fetches_other_branch(remote_repo, monkeypatch):
+    monkeypatch.setitem(CONFIG, "clone_depth", 0)
+    monkeypatch.setitem(CONFIG, "mirror_cache_dir", None)
+
+    assert check_required_workflow_files("git-remote.git", "feature", ["README.md", ".github/workflows/*.yml"])
+    assert not check_required_workflow_files("git-remote.git", "missing", ["README.md"])
+
+
+def test_push_refs_pushes_branch_and_autotest_branch_together(remote_repo):
+    ci_commit = CICommit("git-remote.git", "main", {"sa_login": "CI", "sa_mail": "ci@example.com", "clone_depth": 0})
+
+    autotest_ref = ci_commit.autotest_ref()
+    ci_commit.push_refs([ci_commit.branch_ref, autotest_ref])
+
+    assert remote_repo.references["refs/heads/main"].target == ci_commit.commit_sha
+    assert remote_repo.references[autotest_ref].target == ci_commit.commit_sha
+
+
+def test_check_required_workflow_files_fetches_other_branch_into_ci_commit_repo(remote_repo):
+    ci_commit = CICommit("git-remote.git", "main", {"sa_login": "CI", "sa_mail": "ci@example.com", "clone_depth": 0})
+
+    assert check_required_workflow_files("git-remote.git", "feature", ["README.md"], ci_commit)
+    feature = remote_repo.references["refs/heads/feature"].target
+    assert ci_commit.repo.references["refs/remotes/origin/feature"].target == feature
+
+
+@pytest.fixture
+def git_daemon(remote_repo, tmp_path):
+    """Serves the remote repository over git://, a transport that, unlike local paths, fetches shallow."""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    daemon = subprocess.Popen(["git", "daemon", "--reuseaddr", "--export-all", "--enable=receive-pack",
+                               f"--base-path={tmp_path}", "--listen=127.0.0.1", f"--port={port}", str(tmp_path)])
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield f"git://127.0.0.1:{port}/git-remote.git"
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+@pytest.mark.slow
+def test_ci_commit_fetches_only_the_tip_by_default(remote_repo, git_daemon):
+    ci_commit = CICommit(git_daemon, "main", {"sa_login": "CI", "sa_mail": "ci@example.com"})
+
+    main = remote_repo.references["refs/heads/main"].target
+    assert ci_commit.repo.is_shallow
+    assert ci_commit.parent_sha == main
+    # Only the tip commit was fetched, not its parent.
+    assert remote_repo[main].parents[0].id not in ci_commit.repo
+
+    ci_commit.push()
+    assert remote_repo.references["refs/heads/main"].target == ci_commit.commit_sha
+
+
+FAKE_SSH = """#!/bin/sh
+echo "$@" >> "$SSH_LOG"
+for last; do :; done
+cd "$REMOTE_ROOT" && exec sh -c "$last"
+"""
+
+
+def test_ssh_pushes_share_a_control_master(tmp_path, monkeypatch):
+    """Pushes to an SSH remote go through the git CLI, all with the same ControlMaster socket."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "ssh").write_text(FAKE_SSH)
+    (bin_dir / "ssh").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("SSH_LOG", str(tmp_path / "ssh.log"))
+    monkeypatch.setenv("REMOTE_ROOT", str(tmp_path / "remote"))
+    remote = pygit2.init_repository(str(tmp_path / "remote" / "o" / "r.git"), bare=True)
+
+    local = pygit2.init_repository(str(tmp_path / "local.git"), bare=True)
+    local.remotes.create("origin", "git@github.com:o/r.git")
+    tree = local.TreeBuilder().write()
+    commit = local.create_commit("refs/heads/main", SIGNATURE, SIGNATURE, "ci", tree, [])
+    local.references.create("refs/heads/main_autotests202601200120", commit)
+
+    origin = GitRemote(local, pygit2.RemoteCallbacks(), str(tmp_path / "control"))
+    origin.push(["refs/heads/main"])
+    origin.push(["refs/heads/main_autotests202601200120"])
+
+    assert remote.references["refs/heads/main"].target == commit
+    assert remote.references["refs/heads/main_autotests202601200120"].target == commit
+    calls = (tmp_path / "ssh.log").read_text().splitlines()
+    assert len(calls) == 2
+    control_path = f"ControlPath={tmp_path / 'control' / 'ssh-control'}"
+    assert all("ControlMaster=auto" in call and control_path in call and "git@github.com" in call for call in calls)
+
+    with pytest.raises(pygit2.GitError):
+        origin.push(["refs/heads/missing"])
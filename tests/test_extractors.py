@@ -0,0 +1,73 @@
+import io
+import json
+
+import pytest
+import requests
+
+from checker import app_client
+from checker.apps import csharp_example, load_app
+from checker.extractors import find_meta_content, find_openapi_description
+
+LARGE = 4 * 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def fresh_app_client(requests_mock):
+    # The apps have no deploy ref fast path, so the page is scraped.
+    requests_mock.head("http://app.test/", status_code=404)
+    requests_mock.get("http://app.test/version", status_code=404)
+    requests_mock.head("http://app.test", status_code=404)
+    yield
+    app_client.close_sessions()
+
+
+class CountingStream(io.BytesIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _streamed(requests_mock, url, body: bytes, **kwargs) -> CountingStream:
+    stream = CountingStream(body)
+    requests_mock.get(url, body=stream, **kwargs)
+    return stream
+
+
+def test_meta_tag_is_found_without_reading_whole_page(requests_mock):
+    page = b'<html><head><meta name="deployref" content="abc123"></head><body>' + b"x" * LARGE + b"</body></html>"
+    stream = _streamed(requests_mock, "http://app.test/", page)
+
+    assert load_app("website-example").extract_deploy_ref("http://app.test/") == "abc123"
+    assert stream.bytes_read < 64 * 1024
+
+
+def test_meta_tag_at_end_of_page_and_missing_tag(requests_mock):
+    seen = bytearray()
+    page = b"<html><body>" + b"<p>text</p>" * 10000 + b'<meta name="deployref" content="late"/></body></html>'
+    _streamed(requests_mock, "http://app.test/late", page)
+    assert find_meta_content(requests.get("http://app.test/late", stream=True), "deployref", seen) == "late"
+    assert bytes(seen) == page
+
+    _streamed(requests_mock, "http://app.test/none", b"<html><head></head></html>")
+    assert find_meta_content(requests.get("http://app.test/none", stream=True), "deployref") is None
+
+
+def test_openapi_description_is_read_from_info_only(requests_mock):
+    document = {"openapi": "3.0.1", "info": {"title": "Words", "description": "API (Deploy Ref: 42abc)", "version": "v1"},
+                "paths": {f"/p{i}": {"get": {"description": "info"}} for i in range(100000)}}
+    stream = _streamed(requests_mock, "http://app.test/swagger/v1/swagger.json", json.dumps(document).encode(),
+                       headers={"Content-Type": "application/json"})
+
+    assert csharp_example.extract_deploy_ref("http://app.test") == "42abc"
+    assert stream.bytes_read < 64 * 1024
+
+
+def test_openapi_description_falls_back_to_full_parse(requests_mock):
+    document = {"components": {"schemas": {"info": {"type": "object"}}},
+                "info": {"title": "Words", "description": "late", "version": "v1"}}
+    _streamed(requests_mock, "http://app.test/doc.json", json.dumps(document).encode())
+
+    assert find_openapi_description(requests.get("http://app.test/doc.json", stream=True)) == "late"
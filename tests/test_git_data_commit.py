@@ -0,0 +1,107 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from checker.github_client import GithubContext
+from checker.utils import GitDataCICommit, make_ci_commit
+
+PARENT_SHA = "a" * 40
+TREE_SHA = "b" * 40
+COMMIT_SHA = "c" * 40
+
+
+class FakeGitDataHandler(BaseHTTPRequestHandler):
+    """Just enough of the Git Data API of repository o/r for GitDataCICommit."""
+    requests = []
+    refs = {}
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _ref(self, name):
+        base = f"http://{self.headers['Host']}/repos/o/r"
+        return {"ref": name, "url": f"{base}/git/{name}", "object": {"sha": self.refs[name], "type": "commit"}}
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length)) if length else None
+        FakeGitDataHandler.requests.append((self.command, self.path, payload))
+        base = f"http://{self.headers['Host']}/repos/o/r"
+
+        if self.command == "GET" and self.path.startswith("/repos/o/r/git/ref/"):
+            name = "refs/" + self.path[len("/repos/o/r/git/ref/"):]
+            if name not in self.refs:
+                return self._reply(404, {"message": "Not Found"})
+            return self._reply(200, self._ref(name))
+        if self.command == "GET" and self.path == f"/repos/o/r/git/commits/{PARENT_SHA}":
+            return self._reply(200, {"sha": PARENT_SHA, "tree": {"sha": TREE_SHA, "url": f"{base}/git/trees/{TREE_SHA}"},
+                                     "parents": [], "message": "student"})
+        if self.command == "POST" and self.path == "/repos/o/r/git/commits":
+            return self._reply(201, {"sha": COMMIT_SHA, "tree": {"sha": payload["tree"]}, "message": payload["message"]})
+        if self.command == "POST" and self.path == "/repos/o/r/git/refs":
+            if payload["ref"] in self.refs:
+                return self._reply(422, {"message": "Reference already exists"})
+            self.refs[payload["ref"]] = payload["sha"]
+            return self._reply(201, self._ref(payload["ref"]))
+        if self.command == "PATCH" and self.path.startswith("/repos/o/r/git/refs/"):
+            name = self.path[len("/repos/o/r/git/"):]
+            self.refs[name] = payload["sha"]
+            return self._reply(200, self._ref(name))
+        self._reply(404, {"message": "Not Found"})
+
+    do_GET = do_POST = do_PATCH = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_github():
+    FakeGitDataHandler.requests = []
+    FakeGitDataHandler.refs = {"refs/heads/main": PARENT_SHA}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitDataHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield GithubContext("fake_token", base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    server.shutdown()
+    server.server_close()
+
+
+def test_commit_is_created_without_clone(fake_github):
+    ci_commit = GitDataCICommit("o/r", "main", {"sa_login": "CI", "sa_mail": "ci@example.com"}, fake_github)
+
+    assert ci_commit.parent_sha == PARENT_SHA
+    assert ci_commit.commit_sha == COMMIT_SHA
+    _, _, payload = next(r for r in FakeGitDataHandler.requests if r[0] == "POST")
+    assert payload["tree"] == TREE_SHA
+    assert payload["parents"] == [PARENT_SHA]
+    assert payload["author"] == {"name": "CI", "email": "ci@example.com"}
+
+    ci_commit.push()
+    assert FakeGitDataHandler.refs["refs/heads/main"] == COMMIT_SHA
+
+
+def test_autotest_branch_is_created_or_moved(fake_github):
+    ci_commit = make_ci_commit("api", "git@github.com:o/r.git", "main",
+                               {"sa_login": "CI", "sa_mail": "ci@example.com"}, fake_github)
+
+    ci_commit.push_to_autotest_branch()
+    autotest_refs = [name for name in FakeGitDataHandler.refs if name.startswith("refs/heads/main_autotests")]
+    assert len(autotest_refs) == 1
+    assert FakeGitDataHandler.refs[autotest_refs[0]] == COMMIT_SHA
+
+    FakeGitDataHandler.refs[autotest_refs[0]] = PARENT_SHA
+    ci_commit.push_to_autotest_branch()
+    assert FakeGitDataHandler.refs[autotest_refs[0]] == COMMIT_SHA
+    assert FakeGitDataHandler.requests[-1][2] == {"sha": COMMIT_SHA, "force": True}
+
+
+def test_api_backend_requires_a_token():
+    with pytest.raises(ValueError):
+        make_ci_commit("api", "git@github.com:o/r.git", "main", {}, None)
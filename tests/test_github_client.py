@@ -0,0 +1,17 @@
+from unittest.mock import patch
+
+from checker.github_client import PER_PAGE, GithubContext
+
+
+def test_github_context_memoizes_repositories():
+    with patch('checker.github_client.Github') as mock_github:
+        gh = GithubContext("fake_token")
+
+        assert gh.get_repo("owner/repo") is gh.get_repo("owner/repo")
+        mock_github.return_value.get_repo.assert_called_once_with("owner/repo")
+        mock_github.assert_called_once()
+
+
+def test_github_context_reads_small_pages():
+    assert GithubContext("fake_token").github.per_page == PER_PAGE
+    assert GithubContext("fake_token", per_page=5).github.per_page == 5
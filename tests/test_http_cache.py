@@ -0,0 +1,78 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from checker.http_cache import CachingAdapter, HTTPCache
+
+
+class EtagHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        EtagHandler.requests_seen.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("X-RateLimit-Remaining", "4999")
+            self.end_headers()
+            return
+        body = json.dumps({"id": 1, "status": "completed"}).encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Remaining", "5000")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    EtagHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def cached_session(directory) -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", CachingAdapter(HTTPCache(str(directory))))
+    return session
+
+
+def test_revalidates_cached_response(server, tmp_path):
+    session = cached_session(tmp_path)
+
+    first = session.get(f"{server}/repos/o/r/actions/runs/1")
+    second = session.get(f"{server}/repos/o/r/actions/runs/1")
+
+    assert first.json() == second.json() == {"id": 1, "status": "completed"}
+    assert second.status_code == 200
+    assert second.headers["X-From-Cache"] == "revalidated"
+    assert second.headers["X-RateLimit-Remaining"] == "4999"
+    assert EtagHandler.requests_seen == [None, '"v1"']
+
+
+def test_cache_is_shared_between_sessions(server, tmp_path):
+    cached_session(tmp_path).get(f"{server}/repos/o/r")
+
+    response = cached_session(tmp_path).get(f"{server}/repos/o/r")
+
+    assert response.json()["id"] == 1
+    assert EtagHandler.requests_seen == [None, '"v1"']
+
+
+def test_credentials_are_part_of_cache_key(server, tmp_path):
+    session = cached_session(tmp_path)
+
+    session.get(f"{server}/repos/o/r", headers={"Authorization": "token a"})
+    session.get(f"{server}/repos/o/r", headers={"Authorization": "token b"})
+
+    assert EtagHandler.requests_seen == [None, None]
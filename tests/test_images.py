@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from checker.checks import CONFIG, check_image_size_budget
+from checker.github_client import GithubContext
+from checker.images import LayerSizeCache, inspect_image
+from checker.registry import RegistryClient
+
+
+def _digest(data: bytes) -> str:
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+class FakeImageRegistryHandler(BaseHTTPRequestHandler):
+    """Anonymous registry serving the manifests and blobs in `paths`."""
+    protocol_version = "HTTP/1.1"
+    paths = {}
+    blob_requests = []
+
+    def _handle(self):
+        body = self.paths.get(self.path)
+        if "/blobs/" in self.path:
+            FakeImageRegistryHandler.blob_requests.append(self.path)
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_GET = do_HEAD = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _publish(tag: str, layer_contents: list[bytes]):
+    """Adds an image (behind a multi-platform index) with gzip layers to the fake registry."""
+    paths = FakeImageRegistryHandler.paths
+    layers = []
+    for content in layer_contents:
+        blob = gzip.compress(content)
+        paths[f"/v2/o/app/blobs/{_digest(blob)}"] = blob
+        layers.append({"mediaType": "application/vnd.oci.image.layer.v1.tar+gzip", "digest": _digest(blob), "size": len(blob)})
+    history = [{"created_by": "ENV A=1", "empty_layer": True}] + [{"created_by": f"RUN step {i}"} for i in range(len(layers))]
+    config = json.dumps({"history": history}).encode()
+    paths[f"/v2/o/app/blobs/{_digest(config)}"] = config
+    manifest = json.dumps({"mediaType": "application/vnd.oci.image.manifest.v1+json",
+                           "config": {"digest": _digest(config), "size": len(config)}, "layers": layers}).encode()
+    paths[f"/v2/o/app/manifests/{_digest(manifest)}"] = manifest
+    index = {"mediaType": "application/vnd.oci.image.index.v1+json", "manifests": [
+        {"digest": "sha256:" + "f" * 64, "platform": {"os": "linux", "architecture": "arm64"}},
+        {"digest": _digest(manifest), "platform": {"os": "linux", "architecture": "amd64"}},
+    ]}
+    paths[f"/v2/o/app/manifests/{tag}"] = json.dumps(index).encode()
+
+
+@pytest.fixture
+def registry():
+    FakeImageRegistryHandler.paths = {}
+    FakeImageRegistryHandler.blob_requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeImageRegistryHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield RegistryClient(f"127.0.0.1:{server.server_address[1]}", scheme="http")
+    server.shutdown()
+    server.server_close()
+
+
+def test_inspect_image_measures_layers(registry, tmp_path):
+    _publish("new", [b"a" * 3000, b"b" * 5000])
+    cache = LayerSizeCache(str(tmp_path / "sizes.json"))
+
+    stats = inspect_image(registry, "o/app", "new", cache, measure_uncompressed=True)
+
+    assert [layer.uncompressed for layer in stats.layers] == [3000, 5000]
+    assert [layer.created_by for layer in stats.layers] == ["RUN step 0", "RUN step 1"]
+    assert stats.uncompressed == 8000
+    assert stats.compressed == sum(layer.compressed for layer in stats.layers)
+
+    requests_before = len(FakeImageRegistryHandler.blob_requests)
+    cache = LayerSizeCache(str(tmp_path / "sizes.json"))
+    assert inspect_image(registry, "o/app", "new", cache, measure_uncompressed=True).uncompressed == 8000
+    # Only the config blob is read again, layer sizes come from the cache.
+    assert len(FakeImageRegistryHandler.blob_requests) == requests_before + 1
+
+
+def test_inspect_image_does_not_download_layers_by_default(registry):
+    # Random bytes do not compress, so the second layer is above the cap.
+    _publish("new", [b"a" * 3000, os.urandom(5000)])
+
+    stats = inspect_image(registry, "o/app", "new")
+    assert len(stats.layers) == 2 and stats.uncompressed is None
+    # Only the config blob was read.
+    assert len(FakeImageRegistryHandler.blob_requests) == 1
+
+    capped = inspect_image(registry, "o/app", "new", measure_uncompressed=True, max_layer_bytes=1000)
+    assert [layer.uncompressed is None for layer in capped.layers] == [False, True]
+
+
+def test_check_image_size_budget(registry, tmp_path, monkeypatch, capsys):
+    _publish("old", [b"a" * 3000])
+    _publish("new", [b"a" * 3000, b"b" * 5000])
+    monkeypatch.setitem(CONFIG, "layer_size_cache", str(tmp_path / "sizes.json"))
+    monkeypatch.setitem(CONFIG, "image_max_layers", 2)
+    monkeypatch.setitem(CONFIG, "image_max_uncompressed_bytes", 10000)
+    monkeypatch.setitem(CONFIG, "image_measure_uncompressed", True)
+
+    with patch('checker.github_client.Github'), patch('checker.registry.registry_client', return_value=registry):
+        gh = GithubContext("fake_token")
+        assert check_image_size_budget("o/app", "new", gh, "old") is True
+        assert "+0.0 MiB uncompressed, +1 layers" in capsys.readouterr().out
+
+        monkeypatch.setitem(CONFIG, "image_max_uncompressed_bytes", 4000)
+        assert check_image_size_budget("o/app", "new", gh, "missing") is False
+        out = capsys.readouterr().out
+        assert "No previous image" in out
+        assert "RUN step 1" in out
+
+
+def test_check_image_size_budget_skips_uncompressed_by_default(registry, monkeypatch, capsys):
+    _publish("new", [b"a" * 3000, b"b" * 5000])
+    monkeypatch.setitem(CONFIG, "image_max_uncompressed_bytes", 10)
+
+    with patch('checker.github_client.Github'), patch('checker.registry.registry_client', return_value=registry):
+        assert check_image_size_budget("o/app", "new", GithubContext("fake_token")) is True
+    assert "not measured uncompressed" in capsys.readouterr().out
+    assert len(FakeImageRegistryHandler.blob_requests) == 1
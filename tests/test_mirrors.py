@@ -0,0 +1,63 @@
+import os
+
+import pygit2
+
+from checker.checks import CONFIG
+from checker.mirrors import MirrorCache
+from checker.utils import CICommit, mirror_cache
+
+SIGNATURE = pygit2.Signature("Student", "student@example.com")
+
+
+def _commit(repo, message, parents):
+    tree_builder = repo.TreeBuilder()
+    tree_builder.insert("README.md", repo.create_blob(message.encode()), pygit2.enums.FileMode.BLOB)
+    return repo.create_commit("refs/heads/main", SIGNATURE, SIGNATURE, message, tree_builder.write(), parents)
+
+
+def test_mirror_is_reused_and_updated_incrementally(tmp_path, monkeypatch):
+    remote = pygit2.init_repository(str(tmp_path / "git-remote.git"), bare=True)
+    first = _commit(remote, "first", [])
+    monkeypatch.chdir(tmp_path)
+    config = {"sa_login": "CI", "sa_mail": "ci@example.com", "mirror_cache_dir": str(tmp_path / "mirrors")}
+
+    ci_commit = CICommit("git-remote.git", "main", config)
+    assert ci_commit.parent_sha == first
+    assert os.path.exists(os.path.join(ci_commit.repo.path, "objects", "info", "alternates"))
+    # The run's repository holds no objects of its own besides the new "ci" commit.
+    assert ci_commit.repo[first].tree["README.md"].data == b"first"
+    ci_commit.push()
+
+    second = _commit(remote, "second", [ci_commit.commit_sha])
+    ci_commit = CICommit("git-remote.git", "main", config)
+    assert ci_commit.parent_sha == second
+    assert ci_commit.repo[second].tree["README.md"].data == b"second"
+
+    mirrors = [name for name in os.listdir(tmp_path / "mirrors") if name.endswith(".git")]
+    assert len(mirrors) == 1
+
+
+def test_least_recently_used_mirrors_are_evicted(tmp_path):
+    remotes = []
+    for name in ("git-a.git", "git-b.git"):
+        remote = pygit2.init_repository(str(tmp_path / name), bare=True)
+        _commit(remote, name, [])
+        remotes.append(remote.path)
+    cache = MirrorCache(str(tmp_path / "mirrors"), max_bytes=0, min_age=0)
+    callbacks = pygit2.RemoteCallbacks()
+
+    old = cache.update(remotes[0], "main", callbacks).path
+    os.utime(old.rstrip("/"), (0, 0))
+    new = cache.update(remotes[1], "main", callbacks).path
+
+    assert not os.path.exists(old)
+    # Runs may be blocked on the lock of an evicted mirror, so the lock file is kept.
+    assert os.path.exists(old.rstrip("/") + ".lock")
+    # The mirror in use is kept even above the size limit.
+    assert os.path.exists(new)
+
+
+def test_mirror_cache_is_off_by_default():
+    # A cold mirror fetches full history; runners with an empty cache must keep the shallow fetch.
+    assert CONFIG["mirror_cache_dir"] is None
+    assert mirror_cache(CONFIG) is None
@@ -0,0 +1,41 @@
+from itertools import islice
+from unittest.mock import MagicMock
+
+import pytest
+
+from checker.checks import _run_with_timeout
+from checker.polling import BackoffPollStrategy, FixedPollStrategy, make_poll_strategy
+
+
+def test_fixed_strategy_repeats_interval():
+    assert list(islice(FixedPollStrategy(15).delays(), 3)) == [15, 15, 15]
+
+
+def test_backoff_strategy_grows_up_to_maximum():
+    strategy = BackoffPollStrategy(initial=1, maximum=5, factor=2, jitter=0)
+    assert list(islice(strategy.delays(), 5)) == [1, 2, 4, 5, 5]
+
+
+def test_backoff_strategy_jitter_respects_bounds():
+    strategy = BackoffPollStrategy(initial=1, maximum=4, jitter=0.5, minimum=0.8)
+    for delay in islice(strategy.delays(), 100):
+        assert 0.8 <= delay <= 4
+
+
+def test_make_poll_strategy_backoff_starts_faster_than_interval():
+    strategy = make_poll_strategy("backoff", 16)
+    first = next(strategy.delays())
+    assert first < 16
+
+
+def test_make_poll_strategy_unknown_name():
+    with pytest.raises(ValueError):
+        make_poll_strategy("linear", 15)
+
+
+def test_run_with_timeout_uses_given_strategy():
+    condition = MagicMock(side_effect=[False, False, True])
+    strategy = BackoffPollStrategy(initial=0.01, maximum=0.02, jitter=0)
+
+    assert _run_with_timeout(condition, timeout=1, poll_interval=10, strategy=strategy) is True
+    assert condition.call_count == 3
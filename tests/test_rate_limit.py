@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from github import Github
+from github.Requester import Requester
+
+import checker.github_client as github_client
+from checker.rate_limit import HIGH_PRIORITY, LOW_PRIORITY, RateLimitScheduler
+
+
+def test_low_priority_yields_to_high_priority(tmp_path):
+    scheduler = RateLimitScheduler(str(tmp_path / "state.json"), rate=1, burst=3, low_priority_reserve=2)
+    state = {"tokens": 2, "updated": 100.0}
+
+    assert scheduler._try_acquire(dict(state), HIGH_PRIORITY, 100.0) == 0
+    assert scheduler._try_acquire(dict(state), LOW_PRIORITY, 100.0) == pytest.approx(1.0)
+
+
+def test_low_priority_waits_for_reset_when_budget_is_low(tmp_path):
+    scheduler = RateLimitScheduler(str(tmp_path / "state.json"), low_priority_reserve=5)
+    state = {"remaining": 3, "reset": 160.0}
+
+    assert scheduler._try_acquire(dict(state), LOW_PRIORITY, 100.0) == pytest.approx(60.0)
+    assert scheduler._try_acquire(dict(state), HIGH_PRIORITY, 100.0) == 0
+
+
+def test_retry_after_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "state.json")
+    first = RateLimitScheduler(path)
+    second = RateLimitScheduler(path)
+
+    assert first.record_response(403, {"Retry-After": "30"}) == 30.0
+
+    with second._locked_state() as state:
+        assert second._try_acquire(state, HIGH_PRIORITY, time.time()) > 25
+
+
+def test_retry_after_as_http_date_or_garbage(tmp_path):
+    scheduler = RateLimitScheduler(str(tmp_path / "state.json"))
+    in_a_minute = formatdate(time.time() + 60, usegmt=True)
+
+    assert 55 < scheduler.record_response(429, {"Retry-After": in_a_minute}) <= 60
+    # An unparseable value falls back to the rate limit headers.
+    reset = str(int(time.time()) + 10)
+    headers = {"Retry-After": "soon", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}
+    assert 5 < scheduler.record_response(403, headers) <= 10
+
+
+class SecondaryLimitHandler(BaseHTTPRequestHandler):
+    calls = 0
+
+    def do_GET(self):
+        SecondaryLimitHandler.calls += 1
+        if SecondaryLimitHandler.calls == 1:
+            self.send_response(403)
+            self.send_header("Retry-After", "0")
+            body = json.dumps({"message": "You have exceeded a secondary rate limit."}).encode()
+        else:
+            self.send_response(200)
+            self.send_header("X-RateLimit-Remaining", "4000")
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+            body = json.dumps({"id": 7, "full_name": "o/r"}).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_github_requests_are_retried_after_secondary_limit(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SecondaryLimitHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(github_client, "_scheduler", None)
+    github_client.enable_rate_limit_scheduler(str(tmp_path / "state.json"))
+    try:
+        g = Github(base_url=f"http://127.0.0.1:{server.server_address[1]}", retry=None)
+        assert g.get_repo("o/r").full_name == "o/r"
+        assert SecondaryLimitHandler.calls == 2
+        with open(tmp_path / "state.json") as f:
+            assert json.load(f)["remaining"] == 4000
+    finally:
+        Requester.resetConnectionClasses()
+        server.shutdown()
+        server.server_close()
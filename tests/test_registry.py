@@ -0,0 +1,96 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from checker.checks import CONFIG, check_docker_image_exists
+from checker.github_client import GithubContext
+from checker.registry import RegistryClient
+
+TOKEN = "registry-token"
+
+
+class FakeRegistryHandler(BaseHTTPRequestHandler):
+    """registry:2 stand-in with token authentication and a single image o/app:v1."""
+    protocol_version = "HTTP/1.1"
+    token_requests = []
+    manifest_requests = 0
+
+    def _reply(self, status, data=None, headers=None):
+        body = json.dumps(data).encode() if data is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _handle(self):
+        host = self.headers["Host"]
+        if self.path.startswith("/token"):
+            FakeRegistryHandler.token_requests.append((self.path, self.headers.get("Authorization")))
+            return self._reply(200, {"token": TOKEN, "expires_in": 300})
+        if self.path.startswith("/v2/o/app/manifests/"):
+            FakeRegistryHandler.manifest_requests += 1
+            if self.headers.get("Authorization") != f"Bearer {TOKEN}":
+                challenge = f'Bearer realm="http://{host}/token",service="{host}",scope="repository:o/app:pull"'
+                return self._reply(401, {"errors": []}, {"WWW-Authenticate": challenge})
+            if self.path.endswith("/v1"):
+                return self._reply(200, headers={"Docker-Content-Digest": "sha256:" + "0" * 64})
+        self._reply(404, {"errors": [{"code": "MANIFEST_UNKNOWN"}]})
+
+    do_GET = do_HEAD = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_registry():
+    FakeRegistryHandler.token_requests = []
+    FakeRegistryHandler.manifest_requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeRegistryHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_is_fetched_once_and_reused(fake_registry):
+    client = RegistryClient(fake_registry, "sa", "secret", scheme="http")
+
+    assert client.manifest_exists("o/app", "v1")
+    assert not client.manifest_exists("o/app", "v2")
+    assert client.manifest_exists("o/app", "v1")
+
+    assert len(FakeRegistryHandler.token_requests) == 1
+    path, authorization = FakeRegistryHandler.token_requests[0]
+    assert "scope=repository%3Ao%2Fapp%3Apull" in path
+    assert authorization == "Basic " + base64.b64encode(b"sa:secret").decode()
+    # Only the first request is challenged.
+    assert FakeRegistryHandler.manifest_requests == 4
+
+
+def test_expired_token_is_renewed(fake_registry):
+    client = RegistryClient(fake_registry, "sa", "secret", scheme="http")
+    assert client.manifest_exists("o/app", "v1")
+
+    client._tokens = {scope: (token, 0) for scope, (token, _) in client._tokens.items()}
+    assert client.manifest_exists("o/app", "v1")
+    assert len(FakeRegistryHandler.token_requests) == 2
+
+
+def test_check_docker_image_exists_polls_registry(fake_registry, monkeypatch):
+    monkeypatch.setitem(CONFIG, "timeout", 0.1)
+    monkeypatch.setitem(CONFIG, "poll_interval", 0.1)
+    client = RegistryClient(fake_registry, "sa", "secret", scheme="http")
+
+    with patch('checker.github_client.Github'), patch('checker.registry.registry_client', return_value=client):
+        gh = GithubContext("fake_token")
+        assert check_docker_image_exists("o/app", "v1", gh) is True
+        assert check_docker_image_exists("o/app", "v2", gh) is False
@@ -0,0 +1,98 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from checker.reports import ReportSummary, parse_junit, parse_report
+
+
+def parse(xml: str) -> ReportSummary:
+    return parse_junit(io.BytesIO(xml.encode()))
+
+
+def test_later_failing_suite_fails_the_verdict():
+    summary = parse(
+        '<testsuites>'
+        '<testsuite name="a" tests="3" failures="0" errors="0" skipped="1"/>'
+        '<testsuite name="b" tests="2" failures="1" errors="0" skipped="0"/>'
+        '</testsuites>'
+    )
+
+    assert (summary.tests, summary.failures, summary.skipped) == (5, 1, 1)
+    assert summary.passed is False
+
+
+def test_wrapper_totals_are_not_counted_twice():
+    summary = parse(
+        '<testsuites tests="4" failures="0">'
+        '<testsuite tests="4" failures="0" errors="0"><testsuite tests="4" failures="0" errors="0"/></testsuite>'
+        '</testsuites>'
+    )
+
+    assert summary.tests == 4
+    assert summary.passed is True
+
+
+def test_testcases_are_counted_when_suite_has_no_totals():
+    summary = parse(
+        '<testsuite name="s">'
+        '<testcase name="ok"/>'
+        '<testcase name="broken"><error message="boom"/></testcase>'
+        '<testcase name="todo"><skipped/></testcase>'
+        '</testsuite>'
+    )
+
+    assert (summary.tests, summary.errors, summary.skipped) == (3, 1, 1)
+
+
+def test_summaries_aggregate_across_files():
+    summary = ReportSummary()
+    summary.add(parse('<testsuite tests="2" failures="0" errors="0"/>'))
+    summary.add(parse('<testsuite tests="0" failures="0" errors="0"/>'))
+
+    assert summary.reports == 2
+    assert summary.passed is True
+
+
+def test_large_report_is_parsed_incrementally():
+    cases = "".join(f'<testcase name="t{i}"><system-out>{"x" * 100}</system-out></testcase>' for i in range(20000))
+
+    summary = parse(f'<testsuite name="big">{cases}</testsuite>')
+
+    assert summary.tests == 20000
+    assert summary.passed is True
+
+
+def test_malformed_report_raises():
+    with pytest.raises(ET.ParseError):
+        parse('<testsuite tests="1">')
+
+
+TRX = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<TestRun xmlns="http://microsoft.com/schemas/VisualStudio/TeamTest/2010">'
+    '<ResultSummary outcome="Failed">'
+    '<Counters total="10" executed="9" passed="7" failed="1" error="0" timeout="1" aborted="0"/>'
+    '</ResultSummary>'
+    '</TestRun>'
+)
+
+
+def test_trx_counters_are_read():
+    summary = parse_report("results/tests.trx", io.BytesIO(TRX.encode()))
+
+    assert (summary.tests, summary.failures, summary.errors, summary.skipped) == (10, 2, 0, 1)
+
+
+def test_pytest_json_summary_is_read():
+    report = b'{"created": 1, "summary": {"passed": 4, "skipped": 1, "total": 5, "collected": 5}}'
+
+    summary = parse_report("report.json", io.BytesIO(report))
+
+    assert (summary.tests, summary.failures, summary.skipped) == (5, 0, 1)
+    assert summary.passed is True
+
+
+def test_unrelated_files_are_ignored():
+    assert parse_report("coverage.json", io.BytesIO(b'{"meta": {}, "files": {}}')) is None
+    assert parse_report("logs/output.txt", io.BytesIO(b"hello")) is None
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pygit2
+
+from checker.retention import RetentionPolicy, collect_garbage, select_stale
+from checker.utils import CICommit
+
+SIGNATURE = pygit2.Signature("Student", "student@example.com")
+
+
+def _ref(name):
+    ref = MagicMock()
+    ref.ref = name
+    return ref
+
+
+def _release(tag_name):
+    release = MagicMock()
+    release.tag_name = tag_name
+    return release
+
+
+def test_select_stale_keeps_newest_and_recent():
+    now = datetime(2026, 3, 1)
+    created = {
+        "a": now - timedelta(days=30),
+        "b": now - timedelta(days=20),
+        "c": now - timedelta(days=10),
+        "d": now - timedelta(days=1),
+    }
+
+    assert select_stale(created, RetentionPolicy(keep_last=1, max_age=timedelta(days=14)), now) == ["a", "b"]
+    assert select_stale(created, RetentionPolicy(keep_last=3, max_age=timedelta(days=0)), now) == ["a"]
+
+
+def test_collect_garbage_deletes_through_api():
+    repo = MagicMock()
+    old_branch, new_branch = _ref("refs/heads/main_autotests202501010000"), _ref("refs/heads/main_autotests209901010000")
+    old_tag, new_tag = _ref("refs/tags/ci-20250101-000000"), _ref("refs/tags/ci-20990101-000000")
+    repo.get_git_matching_refs.side_effect = lambda prefix: [old_branch, new_branch] if prefix.startswith("heads/") else [old_tag, new_tag]
+    old_release, new_release, other_release = _release("ci-20250101-000000"), _release("ci-20990101-000000"), _release("v1.0")
+    repo.get_releases.return_value = [old_release, new_release, other_release]
+
+    assert collect_garbage(repo, "main", RetentionPolicy(keep_last=1)) == 3
+
+    repo.get_git_matching_refs.assert_any_call("heads/main_autotests")
+    old_branch.delete.assert_called_once()
+    old_tag.delete.assert_called_once()
+    old_release.delete_release.assert_called_once()
+    new_branch.delete.assert_not_called()
+    new_tag.delete.assert_not_called()
+    new_release.delete_release.assert_not_called()
+    other_release.delete_release.assert_not_called()
+
+
+def test_collect_garbage_dry_run_deletes_nothing():
+    repo = MagicMock()
+    old_branch = _ref("refs/heads/main_autotests202501010000")
+    repo.get_git_matching_refs.side_effect = lambda prefix: [old_branch] if prefix.startswith("heads/") else []
+    repo.get_releases.return_value = []
+
+    assert collect_garbage(repo, "main", RetentionPolicy(keep_last=0, dry_run=True)) == 1
+    old_branch.delete.assert_not_called()
+
+
+def test_collect_garbage_deletes_refs_in_one_git_push(tmp_path, monkeypatch):
+    remote = pygit2.init_repository(str(tmp_path / "git-remote.git"), bare=True)
+    tree = remote.TreeBuilder().write()
+    head = remote.create_commit("refs/heads/main", SIGNATURE, SIGNATURE, "first", tree, [])
+    stale = ["refs/heads/main_autotests202501010000", "refs/tags/ci-20250101-000000"]
+    for name in stale + ["refs/heads/main_autotests209901010000"]:
+        remote.references.create(name, head)
+    monkeypatch.chdir(tmp_path)
+    ci_commit = CICommit("git-remote.git", "main", {"sa_login": "CI", "sa_mail": "ci@example.com", "clone_depth": 0})
+
+    repo = MagicMock()
+    repo.get_git_matching_refs.side_effect = lambda prefix: [_ref(name) for name in remote.references
+                                                             if name.startswith(f"refs/{prefix}")]
+    repo.get_releases.return_value = []
+
+    assert collect_garbage(repo, "main", RetentionPolicy(keep_last=0), ci_commit) == 2
+    assert sorted(remote.references) == ["refs/heads/main", "refs/heads/main_autotests209901010000"]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of each entry point in microseconds, best of RUNS. With heavy
+# dependencies imported lazily every entry point takes about 140-180 ms on a laptop,
+# mostly requests; before, it took more than 350 ms.
+BUDGETS = {
+    "scripts.check_webhooks_devops_assignment": 200_000,
+    "scripts.check_docker_assignment": 200_000,
+    "scripts.check_compose_assignment": 200_000,
+    "scripts.check_github_actions_assignment": 200_000,
+}
+RUNS = 5
+# Loaded on first use only, never at startup.
+LAZY_MODULES = ("github", "pygit2", "bs4", "xml.etree.ElementTree", "checker.artifacts", "checker.images")
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Runs `python -X importtime -c "import module"` and returns the cumulative time per imported module."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2))
+    return times
+
+
+@pytest.mark.parametrize("entry_point", sorted(BUDGETS))
+def test_entry_point_startup(entry_point):
+    runs = [_import_times(entry_point) for _ in range(RUNS)]
+
+    eager = [module for module in LAZY_MODULES if module in runs[0]]
+    assert not eager, f"{entry_point} imports {', '.join(eager)} at startup"
+
+    best = min(times[entry_point] for times in runs)
+    assert best <= BUDGETS[entry_point], \
+        f"{entry_point} takes {best / 1000:.0f} ms to import, budget is {BUDGETS[entry_point] / 1000:.0f} ms"
@@ -0,0 +1,118 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+import pytest
+import requests
+from unittest.mock import MagicMock
+
+from checker.checks import CONFIG, _get_workflow_run
+from checker.webhooks import WorkflowEventReceiver
+
+WORKFLOW_RUN_COMPLETED = {
+    "action": "completed",
+    "workflow_run": {
+        "id": 30433642,
+        "name": "CI",
+        "head_branch": "main_autotests202601200120",
+        "head_sha": "acb5820ced9479c074f688cc328bf03f341a511d",
+        "event": "push",
+        "status": "completed",
+        "conclusion": "success",
+        "check_suite_id": 42,
+    },
+    "repository": {"full_name": "octo-org/octo-repo"},
+}
+
+CHECK_SUITE_COMPLETED = {
+    "action": "completed",
+    "check_suite": {
+        "id": 42,
+        "head_sha": "acb5820ced9479c074f688cc328bf03f341a511d",
+        "status": "completed",
+        "conclusion": "failure",
+    },
+}
+
+
+@pytest.fixture
+def receiver():
+    receiver = WorkflowEventReceiver(host="127.0.0.1", port=0, secret="s3cr3t")
+    receiver.start()
+    yield receiver
+    receiver.stop()
+
+
+def deliver(receiver, event, payload, secret="s3cr3t"):
+    body = json.dumps(payload).encode()
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return requests.post(
+        f"http://127.0.0.1:{receiver.port}/",
+        data=body,
+        headers={"X-GitHub-Event": event, "X-Hub-Signature-256": signature, "Content-Type": "application/json"},
+    )
+
+
+def test_receiver_wakes_on_workflow_run_completion(receiver):
+    assert receiver.wait_for_completion(30433642, 42, timeout=0.01) is None
+
+    assert deliver(receiver, "workflow_run", WORKFLOW_RUN_COMPLETED).status_code == 202
+
+    run = receiver.wait_for_completion(30433642, 42, timeout=1)
+    assert run["conclusion"] == "success"
+
+
+def test_receiver_matches_check_suite_of_run(receiver):
+    deliver(receiver, "check_suite", CHECK_SUITE_COMPLETED)
+
+    assert receiver.has_events_for(1, 42) is True
+    assert receiver.wait_for_completion(1, 42, timeout=1)["conclusion"] == "failure"
+
+
+def test_receiver_rejects_bad_signature(receiver):
+    response = deliver(receiver, "workflow_run", WORKFLOW_RUN_COMPLETED, secret="wrong")
+
+    assert response.status_code == 401
+    assert receiver.has_events_for(30433642, 42) is False
+
+
+def test_get_workflow_run_is_woken_by_event(receiver, monkeypatch):
+    monkeypatch.setitem(CONFIG, "timeout", 5)
+    monkeypatch.setitem(CONFIG, "poll_interval", 5)
+    monkeypatch.setitem(CONFIG, "webhook_grace", 5)
+    monkeypatch.setattr("checker.checks.active_receiver", lambda: receiver)
+
+    running = MagicMock(id=30433642, check_suite_id=42, status="in_progress")
+    finished = MagicMock(id=30433642, check_suite_id=42, status="completed", conclusion="success")
+    repo = MagicMock()
+    repo.get_workflow_run.return_value = finished
+
+    threading.Timer(0.2, deliver, args=(receiver, "workflow_run", WORKFLOW_RUN_COMPLETED)).start()
+    start = time.time()
+
+    assert _get_workflow_run(repo, lambda: running) is finished
+    assert time.time() - start < 2
+    repo.get_workflow_run.assert_called_once_with(30433642)
+
+
+def test_completion_event_wakes_only_once(receiver, monkeypatch):
+    monkeypatch.setitem(CONFIG, "timeout", 5)
+    monkeypatch.setitem(CONFIG, "poll_interval", 0.3)
+    monkeypatch.setitem(CONFIG, "poll_strategy", "fixed")
+    monkeypatch.setitem(CONFIG, "webhook_grace", 5)
+    monkeypatch.setattr("checker.checks.active_receiver", lambda: receiver)
+    sleeps = []
+    monkeypatch.setattr("checker.checks.sleep", sleeps.append)
+
+    running = MagicMock(id=30433642, check_suite_id=42, status="in_progress")
+    finished = MagicMock(id=30433642, check_suite_id=42, status="completed", conclusion="success")
+    repo = MagicMock()
+    # The API lags behind the webhook and still reports the run as running twice.
+    repo.get_workflow_run.side_effect = [running, running, finished]
+    deliver(receiver, "workflow_run", WORKFLOW_RUN_COMPLETED)
+
+    assert _get_workflow_run(repo, lambda: running) is finished
+    assert repo.get_workflow_run.call_count == 3
+    assert sleeps == [0.3, 0.3]